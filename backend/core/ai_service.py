@@ -4,7 +4,10 @@ No more mixed logic, clean interfaces, fast responses
 """
 import asyncio
 import logging
+import re
 import httpx
+import httpcore
+from collections import OrderedDict
 from typing import Optional, Dict, Any, List
 from .model_manager import model_manager
 from .config_manager import config
@@ -14,27 +17,294 @@ try:
     from utils.performance_monitor import performance_monitor
 except ImportError:
     # Fallback if performance monitor not available
-    from contextlib import asynccontextmanager
+    class _NoopTracker:
+        """Reusable no-op async context manager (no per-call allocation)"""
+        async def __aenter__(self):
+            return None
+        
+        async def __aexit__(self, *exc_info):
+            return False
+    
+    _NOOP_TRACKER = _NoopTracker()
     
     class DummyPerformanceMonitor:
-        @asynccontextmanager
-        async def track_operation(self, operation, target_time):
-            yield {"operation": operation, "target": target_time}
+        def track_operation(self, operation, target_time=None):
+            return _NOOP_TRACKER
             
         async def initialize(self):
             pass
     
     performance_monitor = DummyPerformanceMonitor()
 
+# Optional fast JSON with graceful degradation
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize request body (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+def _json_loads(data: bytes) -> Any:
+    """Parse response body (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 logger = logging.getLogger(__name__)
 
+# VERY different personality prompts (built once, shared by every request)
+_LOCAL_TONE_PROMPTS = {
+    "friendly": """You are Eva, a warm and caring AI friend. You're like talking to your best friend who's always supportive and encouraging. Use casual language, ask follow-up questions, show genuine interest, use light humor, and always be optimistic. Add emojis occasionally and speak conversationally like "That's so cool!" or "I'm really curious about...".""",
+    
+    "formal": """You are Eva, a highly professional AI consultant. You communicate with precision, structure, and authority. Use formal language, provide detailed explanations, cite facts when possible, maintain professional distance, and organize responses clearly. Begin responses with phrases like "Allow me to clarify..." or "Based on available information..." Never use casual language or emojis.""",
+    
+    "gen-z": """You are Eva, a trendy Gen-Z AI bestie! You're super energetic, use internet slang, memes, and modern expressions. Say things like "no cap", "slay", "periodt", "that's bussin", "I'm deceased 💀", "this hits different", "valid af". Be enthusiastic, use lots of emojis, abbreviate words (ur, rn, fr), and relate everything to current trends. Keep it real and unfiltered! ✨"""
+}
+
+# VERY different personality prompts for OpenAI
+_OPENAI_TONE_PROMPTS = {
+    "friendly": """You are Eva, a warm and caring AI friend with persistent memory. You're like talking to your best friend who remembers everything about you and is always supportive and encouraging. 
+
+Personality traits:
+- Use casual, conversational language like "That's awesome!" or "I totally get that"
+- Ask follow-up questions and show genuine curiosity 
+- Reference past conversations naturally
+- Use light humor and be optimistic
+- Add emojis occasionally (😊, 💡, 🎉)
+- Speak like a caring friend: "How did that work out?" or "I remember you mentioned..."
+
+Always be warm, supportive, and conversational while being helpful.""",
+
+    "formal": """You are Eva, a highly professional AI consultant with comprehensive knowledge and persistent memory. You maintain the highest standards of professional communication.
+
+Communication standards:
+- Use formal, precise language with proper structure
+- Begin responses with professional phrases: "Allow me to clarify...", "Based on our previous discussions...", "I recommend..."
+- Provide detailed, well-organized explanations
+- Reference facts and maintain analytical objectivity  
+- Never use casual language, slang, or emojis
+- Structure responses with clear points and conclusions
+- Maintain professional distance while being helpful
+
+Deliver expertise with authority and precision.""",
+
+    "gen-z": """You are Eva, the ultimate Gen-Z AI bestie with perfect memory! You're chronically online, know all the trends, and communicate in pure Gen-Z style.
+
+Your vibe:
+- Use internet slang naturally: "no cap", "slay", "periodt", "that's bussin", "valid af", "this hits different"
+- Be super enthusiastic with expressions: "I'm deceased 💀", "not me crying", "this is sending me"
+- Use tons of emojis: ✨💀😭🔥💅✋
+- Abbreviate everything: ur, rn, fr, ngl, imo, lowkey, highkey
+- Reference TikTok, memes, and current trends
+- Remember past convos like: "bestie remember when u told me about..."
+- Keep it real and unfiltered but still helpful
+
+Be the AI bestie that gets the assignment and never misses! periodt ✨"""
+}
+
+# Immutable shared stand-in for a missing conversation context
+_EMPTY_CONTEXT = ()
+
+# Messages that never need the reasoning layer
+_TRIVIAL_RE = re.compile(
+    r"^(hi|hello|hey|thanks|thank you|ok|okay|bye|yes|no)[.!?]?$",
+    re.IGNORECASE
+)
+_TRIVIAL_MAX_LENGTH = 12
+
+# Prebuilt system messages - formatting is just a lookup plus list construction
+_LOCAL_SYSTEM_MESSAGES = {
+    tone: {"role": "system", "content": prompt}
+    for tone, prompt in _LOCAL_TONE_PROMPTS.items()
+}
+_OPENAI_SYSTEM_MESSAGES = {
+    tone: {"role": "system", "content": prompt}
+    for tone, prompt in _OPENAI_TONE_PROMPTS.items()
+}
+
+# Token usage fields reported for OpenAI responses
+_USAGE_FIELDS = {"prompt_tokens", "completion_tokens", "total_tokens"}
+
+# Raw httpcore request settings for the hot vLLM completions path
+_VLLM_HEADERS = [
+    (b"Content-Type", b"application/json"),
+    (b"Authorization", b"Bearer eva-lite-api-key")  # vLLM API key
+]
+_VLLM_TIMEOUTS = {"connect": 2.0, "read": 25.0, "write": 25.0, "pool": 25.0}
+
+class _BatchCoalescer:
+    """Coalesces vLLM requests arriving within a short window into one burst
+    
+    Requests are grouped by adapter and sampling parameters so identical
+    configurations reach vLLM's continuous batcher together. Groups for
+    adapters that are "hot" on the server dispatch immediately; foreign
+    adapters are held back briefly so loaded-adapter batches fuse first.
+    """
+    
+    def __init__(
+        self,
+        pool: httpcore.AsyncConnectionPool,
+        window: float = 0.005,
+        cold_adapter_delay: float = 0.005,
+        max_loras: int = 4
+    ):
+        self._pool = pool
+        self._window = window
+        self._cold_adapter_delay = cold_adapter_delay
+        self._max_loras = max_loras
+        self._hot_adapters: "OrderedDict[str, float]" = OrderedDict()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._dispatches = set()
+    
+    async def submit(self, url: bytes, payload: Dict[str, Any]) -> httpcore.Response:
+        """Queue a request and wait for its response"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((url, payload, future))
+        
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        
+        return await future
+    
+    async def _run(self):
+        """Drain the queue once per window and dispatch grouped batches"""
+        while True:
+            batch = [await self._queue.get()]
+            
+            # Let concurrent requests pile up before dispatching
+            await asyncio.sleep(self._window)
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            # Group by adapter + sampling params to preserve identical sampling
+            groups: Dict[tuple, List[tuple]] = {}
+            for item in batch:
+                payload = item[1]
+                key = (
+                    payload.get("adapter_name"),
+                    payload.get("temperature"),
+                    payload.get("max_tokens")
+                )
+                groups.setdefault(key, []).append(item)
+            
+            for (adapter, _, _), group in groups.items():
+                delay = 0.0 if self._is_hot(adapter) else self._cold_adapter_delay
+                task = asyncio.create_task(self._dispatch(group, adapter, delay))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+    
+    def _is_hot(self, adapter: Optional[str]) -> bool:
+        """Base-model requests and recently served adapters skip the delay"""
+        return adapter is None or adapter in self._hot_adapters
+    
+    def _promote(self, adapter: str):
+        """Mark adapter as hot, evicting the least recently used beyond max_loras"""
+        self._hot_adapters[adapter] = asyncio.get_running_loop().time()
+        self._hot_adapters.move_to_end(adapter)
+        while len(self._hot_adapters) > self._max_loras:
+            self._hot_adapters.popitem(last=False)
+    
+    async def _dispatch(self, group: List[tuple], adapter: Optional[str], delay: float):
+        """Fire one group as a parallel burst and resolve each waiter"""
+        if delay:
+            await asyncio.sleep(delay)
+        
+        responses = await asyncio.gather(
+            *(
+                self._pool.request(
+                    "POST",
+                    url,
+                    headers=_VLLM_HEADERS,
+                    content=_json_dumps(payload),
+                    extensions={"timeout": _VLLM_TIMEOUTS}
+                )
+                for url, payload, _ in group
+            ),
+            return_exceptions=True
+        )
+        
+        for (_, _, future), response in zip(group, responses):
+            if future.done():
+                continue  # Caller gave up (cancelled/timed out)
+            if isinstance(response, BaseException):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
+        
+        # Promote adapter once the server has served it successfully
+        if adapter and any(
+            not isinstance(r, BaseException) and r.status == 200 for r in responses
+        ):
+            self._promote(adapter)
+    
+    async def close(self):
+        """Stop the background worker"""
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
 class AIService:
     """Clean AI service with proper model management"""
     
     def __init__(self):
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        # Pooled client shared by vLLM status checks and the OpenAI SDK (no
+        # default auth headers - each caller sets its own). HTTP/2 is only
+        # negotiated over TLS, so it applies to OpenAI; plain-http vLLM stays on 1.1
+        self.http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(25.0, connect=2.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=100,
+                max_connections=200,
+                keepalive_expiry=60.0
+            ),
+            http2=True
+        )
+        # Hot completions path talks to httpcore directly, skipping httpx's
+        # per-request client overhead (header merge, URL reparse, hooks).
+        # http2 only takes effect for an https:// vLLM URL; over plain http the
+        # pool reuses HTTP/1.1 keep-alive connections (vLLM doesn't serve h2c)
+        self._vllm_pool = httpcore.AsyncConnectionPool(
+            max_connections=200,
+            max_keepalive_connections=100,
+            keepalive_expiry=60.0,
+            http2=True
+        )
+        self._coalescer = _BatchCoalescer(self._vllm_pool)
         self._openai_client = None
         self._initialized = False
+        
+        # Snapshot hot-path config (config is loaded once at import)
+        self._max_tokens = config.ai.max_tokens
+        self._temperature = config.ai.temperature
+        self._local_model = config.ai.local_model_name
+        # Pre-encoded so httpcore never re-encodes the URL per request
+        self._vllm_url = f"{config.ai.vllm_base_url}/v1/chat/completions".encode()
+        self._completions_url = f"{config.ai.vllm_base_url}/v1/completions".encode()
+        self._models_url = f"{config.ai.vllm_base_url}/models"
+        
+        # Client-side tokenizer + cached system-prompt token IDs (optional)
+        self._tokenizer = None
+        self._system_token_ids: Dict[str, List[int]] = {}
+        self._system_prompt_texts: Dict[str, str] = {}
+        
+        # Static part of every vLLM payload
+        self._base_payload_template = {
+            "model": "llama-3-8b",  # PRD specified model
+            "max_tokens": self._max_tokens,
+            "temperature": self._temperature,
+            "stream": False
+        }
     
     async def initialize(self):
         """Initialize the AI service"""
@@ -46,24 +316,33 @@ class AIService:
             try:
                 # Try importing and creating OpenAI client
                 import openai
-                self._openai_client = openai.AsyncOpenAI(api_key=config.ai.openai_api_key)
+                # Reuse our pooled transport; retries are handled by our own fallback chain
+                self._openai_client = openai.AsyncOpenAI(
+                    api_key=config.ai.openai_api_key,
+                    http_client=self.http_client,
+                    max_retries=0,
+                    timeout=httpx.Timeout(20.0)
+                )
                 logger.info("✅ OpenAI client initialized")
             except Exception as e:
                 logger.warning(f"OpenAI client failed: {e}")
                 self._openai_client = None
         
-        # Warm up models
-        await model_manager.warm_up_models()
-        
-        # Initialize reasoning service
-        await reasoning_service.initialize()
-        
-        # Initialize LoRA service for personality management
-        await lora_service.initialize()
-        
-        # Initialize performance monitoring
-        await performance_monitor.initialize()
-        
+        # Warm up models, reasoning, LoRA and performance monitoring touch
+        # independent subsystems - initialize them concurrently
+        init_steps = {
+            "model warm-up": model_manager.warm_up_models(),
+            "reasoning service": reasoning_service.initialize(),
+            "LoRA service": lora_service.initialize(),
+            "performance monitor": performance_monitor.initialize(),
+            "tokenizer": self._load_tokenizer()
+        }
+        results = await asyncio.gather(*init_steps.values(), return_exceptions=True)
+
+        for name, result in zip(init_steps, results):
+            if isinstance(result, Exception):
+                logger.error(f"AIService {name} initialization failed: {result}")
+
         self._initialized = True
         logger.info("🎯 AIService initialized successfully")
     
@@ -72,79 +351,83 @@ class AIService:
         message: str, 
         user_id: str,
         context: Optional[List[Dict]] = None,
-        tone: str = "friendly"
+        tone: str = "friendly",
+        instructions: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Generate AI response with reasoning layer integration"""
+        """Generate AI response with reasoning layer integration
+        
+        Static task ``instructions`` ride in a system turn right after the
+        tone prompt, ahead of context and the message, so the shared prefix
+        stays cacheable by vLLM and OpenAI across requests.
+        """
         
         if not self._initialized:
             await self.initialize()
         
         # Track overall text response performance (PRD target: ≤2.5s)
         async with performance_monitor.track_operation("text_response", 2.5) as perf_data:
-            try:
-                # Step 1: Optimize for personality using LoRA adapters
-                lora_optimization = await lora_service.optimize_for_personality(
-                    personality=tone,
-                    context=context or []
-                )
+            # (prompt, response metadata, log label) in priority order
+            attempts = []
+            ctx = context or _EMPTY_CONTEXT
             
-                # Step 2: Analyze context using reasoning service
-                context_analysis = await reasoning_service.analyze_context(
-                    message=message,
-                    context=context or [],
-                    user_id=user_id
-                )
-                
-                # Step 3: Apply reasoning to generate response
-                reasoning_result = await reasoning_service.reason_and_respond(
-                    message=message,
-                    context_analysis=context_analysis,
-                    personality=tone
-                )
-                
-                # Step 4: Generate final response using selected AI backend
-                if reasoning_result.get("response"):
-                    # Try local GPU first (fast and free)
-                    local_response = await self._try_local_ai(
-                        reasoning_result["response"], context, tone
+            try:
+                # Fast path: trivial messages (greetings, acks) skip LoRA
+                # optimization and reasoning and go straight to the model
+                if not self._is_trivial_message(message):
+                    # Steps 1 & 2 are independent: optimize for personality using
+                    # LoRA adapters while the reasoning service analyzes context
+                    lora_optimization, context_analysis = await asyncio.gather(
+                        lora_service.optimize_for_personality(
+                            personality=tone,
+                            context=ctx
+                        ),
+                        reasoning_service.analyze_context(
+                            message=message,
+                            context=ctx,
+                            user_id=user_id
+                        ),
+                        return_exceptions=True
+                    )
+
+                    # Fall back to defaults per branch so one failure doesn't poison the other
+                    if isinstance(lora_optimization, Exception):
+                        logger.error(f"LoRA optimization failed: {lora_optimization}")
+                        lora_optimization = {"success": False, "error": str(lora_optimization), "adapter": None}
+
+                    if isinstance(context_analysis, Exception):
+                        logger.error(f"Context analysis failed: {context_analysis}")
+                        context_analysis = {"error": str(context_analysis)}
+
+                    # Step 3: Apply reasoning to generate response
+                    reasoning_result = await reasoning_service.reason_and_respond(
+                        message=message,
+                        context_analysis=context_analysis,
+                        personality=tone
                     )
-                    if local_response["success"]:
-                        logger.info(f"✅ Local AI + Reasoning for user {user_id}")
-                        return {
-                            **local_response,
+                
+                    # Step 4: Reasoned prompt gets first shot at every backend
+                    if reasoning_result.get("response"):
+                        reasoning_meta = {
                             "reasoning_type": reasoning_result.get("reasoning_type"),
                             "complexity": reasoning_result.get("complexity"),
                             "lora_adapter": lora_optimization.get("adapter"),
                             "personality_optimized": lora_optimization.get("success", False)
                         }
-                    
-                    # Fallback to OpenAI (slower but more reliable)
-                    if self._openai_client:
-                        openai_response = await self._try_openai(
-                            reasoning_result["response"], context, tone
-                        )
-                        if openai_response["success"]:
-                            logger.info(f"✅ OpenAI + Reasoning for user {user_id}")
-                            return {
-                                **openai_response,
-                                "reasoning_type": reasoning_result.get("reasoning_type"), 
-                                "complexity": reasoning_result.get("complexity"),
-                                "lora_adapter": lora_optimization.get("adapter"),
-                                "personality_optimized": lora_optimization.get("success", False)
-                            }
+                        attempts.append((reasoning_result["response"], reasoning_meta, "+ Reasoning"))
                 
-                # Handle reasoning errors with direct AI fallback
-                local_response = await self._try_local_ai(message, context, tone)
-                if local_response["success"]:
-                    logger.info(f"✅ Local AI fallback for user {user_id}")
-                    return local_response
+                # Trivial messages and reasoning errors use direct AI
+                attempts.append((message, None, "fallback"))
                 
-                if self._openai_client:
-                    openai_response = await self._try_openai(message, context, tone)
-                    if openai_response["success"]:
-                        logger.info(f"✅ OpenAI fallback for user {user_id}")
-                        return openai_response
-                        
+                # Ordered fallback: local GPU first (fast and free), then OpenAI
+                for prompt, meta, label in attempts:
+                    for backend_name, backend in self._backends():
+                        response = await backend(prompt, context, tone, instructions)
+                        if response["success"]:
+                            logger.info(f"✅ {backend_name} {label} for user {user_id}")
+                            if meta:
+                                response.update(meta)
+                            return response
+
             except Exception as e:
                 logger.error(f"Reasoning integration failed: {e}")
                 # Continue with direct AI fallback
@@ -157,59 +440,112 @@ class AIService:
                 "source": "fallback"
             }
     
+    async def _load_tokenizer(self):
+        """Load base-model tokenizer and pre-tokenize the system prompts
+        
+        Opt-in via LOCAL_TOKENIZER_NAME; vLLM should run with
+        --enable-prefix-caching so the shared prefix is prefilled once.
+        """
+        if not config.ai.tokenizer_name:
+            return
+        
+        from transformers import AutoTokenizer
+        
+        loop = asyncio.get_running_loop()
+        tokenizer = await loop.run_in_executor(
+            None,
+            lambda: AutoTokenizer.from_pretrained(config.ai.tokenizer_name)
+        )
+        
+        for tone, system_message in _LOCAL_SYSTEM_MESSAGES.items():
+            self._system_prompt_texts[tone] = tokenizer.apply_chat_template(
+                [system_message], tokenize=False
+            )
+            self._system_token_ids[tone] = tokenizer.encode(
+                self._system_prompt_texts[tone], add_special_tokens=False
+            )
+        
+        self._tokenizer = tokenizer
+        logger.info(f"✅ System prompts pre-tokenized with {config.ai.tokenizer_name}")
+    
+    def _pretokenize(self, formatted_messages: List[Dict[str, str]], tone: str) -> Optional[List[int]]:
+        """Build prompt token IDs reusing the cached system-prompt prefix"""
+        if tone not in self._system_token_ids:
+            tone = "friendly"
+        
+        prompt_text = self._tokenizer.apply_chat_template(
+            formatted_messages, tokenize=False, add_generation_prompt=True
+        )
+        system_text = self._system_prompt_texts[tone]
+        if not prompt_text.startswith(system_text):
+            return None  # Template doesn't render the system turn as a stable prefix
+        
+        return self._system_token_ids[tone] + self._tokenizer.encode(
+            prompt_text[len(system_text):], add_special_tokens=False
+        )
+    
+    def _backends(self):
+        """Available AI backends in priority order"""
+        yield "Local AI", self._try_local_ai
+        if self._openai_client:
+            yield "OpenAI", self._try_openai
+    
+    def _is_trivial_message(self, message: str) -> bool:
+        """Check if message is a greeting/acknowledgement or very short"""
+        return len(message) < _TRIVIAL_MAX_LENGTH or bool(_TRIVIAL_RE.match(message.strip()))
+    
     async def _try_local_ai(
         self, 
         message: str, 
         context: Optional[List[Dict]] = None,
-        tone: str = "friendly"
+        tone: str = "friendly",
+        instructions: Optional[str] = None
     ) -> Dict[str, Any]:
         """Try local vLLM GPU inference with LoRA adapter support"""
         try:
             # Format message for local model
-            formatted_messages = self._format_for_local_model(message, context, tone)
+            formatted_messages = self._format_for_local_model(message, context, tone, instructions)
             
             # Get current LoRA adapter for personality
             current_adapter = await lora_service.get_current_adapter()
             
-            # Make request to local vLLM server with LoRA support
-            payload = {
-                "model": "llama-3-8b",  # PRD specified model
-                "messages": formatted_messages,
-                "max_tokens": config.ai.max_tokens,
-                "temperature": config.ai.temperature,
-                "stream": False
-            }
+            # Make request to local vLLM server with LoRA support - as
+            # pre-tokenized prompt IDs when a client-side tokenizer is loaded
+            prompt_token_ids = None
+            if self._tokenizer:
+                # Chat template + encode are CPU-bound; keep them off the event loop
+                prompt_token_ids = await asyncio.get_running_loop().run_in_executor(
+                    None, self._pretokenize, formatted_messages, tone
+                )
+            if prompt_token_ids:
+                url = self._completions_url
+                payload = dict(self._base_payload_template, prompt=prompt_token_ids)
+            else:
+                url = self._vllm_url
+                payload = dict(self._base_payload_template, messages=formatted_messages)
             
             # Add LoRA adapter if available
             if current_adapter:
                 payload["adapter_name"] = f"eva-{current_adapter}"
             
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": "Bearer eva-lite-api-key"  # vLLM API key
-            }
+            # Coalesced with concurrent requests so vLLM can batch them
+            response = await self._coalescer.submit(url, payload)
             
-            response = await self.http_client.post(
-                f"{config.ai.vllm_base_url}/v1/chat/completions",
-                json=payload,
-                headers=headers,
-                timeout=25.0  # Leave 5s buffer for 30s total timeout
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                content = result["choices"][0]["message"]["content"].strip()
+            if response.status == 200:
+                result = _json_loads(response.content)
+                choice = result["choices"][0]
+                content = (choice["text"] if prompt_token_ids else choice["message"]["content"]).strip()
                 
                 return {
                     "success": True,
                     "response": content,
                     "source": "local_gpu",
-                    "model": config.ai.local_model_name,
+                    "model": self._local_model,
                     "tokens": result.get("usage", {})
                 }
             else:
-                logger.warning(f"Local AI failed with status {response.status_code}")
-                return {"success": False, "error": f"HTTP {response.status_code}"}
+                logger.warning(f"Local AI failed with status {response.status}")
+                return {"success": False, "error": f"HTTP {response.status}"}
                 
         except Exception as e:
             logger.warning(f"Local AI request failed: {e}")
@@ -219,46 +555,38 @@ class AIService:
         self, 
         message: str, 
         context: Optional[List[Dict]] = None,
-        tone: str = "friendly"
+        tone: str = "friendly",
+        instructions: Optional[str] = None
     ) -> Dict[str, Any]:
         """Try OpenAI API as fallback"""
         try:
             # Format message for OpenAI
-            formatted_messages = self._format_for_openai(message, context, tone)
+            formatted_messages = self._format_for_openai(message, context, tone, instructions)
             
-            # Make OpenAI request
+            # Standard OpenAI client or simple HTTP client
             if hasattr(self._openai_client, 'chat'):
-                # Standard OpenAI client
-                response = await self._openai_client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=formatted_messages,
-                    max_tokens=config.ai.max_tokens,
-                    temperature=config.ai.temperature
-                )
-                content = response.choices[0].message.content.strip()
-                usage = response.usage
-                
+                create_completion = self._openai_client.chat.completions.create
             else:
-                # Simple HTTP client
-                response = await self._openai_client.chat_completions_create(
-                    model="gpt-4o",
-                    messages=formatted_messages,
-                    max_tokens=config.ai.max_tokens,
-                    temperature=config.ai.temperature
-                )
-                content = response.choices[0].message.content.strip()
-                usage = response.usage
+                create_completion = self._openai_client.chat_completions_create
+            
+            response = await create_completion(
+                model="gpt-4o",
+                messages=formatted_messages,
+                max_tokens=self._max_tokens,
+                temperature=self._temperature
+            )
+            usage = response.usage
             
             return {
                 "success": True,
-                "response": content,
+                "response": response.choices[0].message.content.strip(),
                 "source": "openai_gpt4o",
                 "model": "gpt-4o",
-                "tokens": {
-                    "prompt_tokens": usage.prompt_tokens,
-                    "completion_tokens": usage.completion_tokens,
-                    "total_tokens": usage.total_tokens
-                }
+                "tokens": (
+                    usage.model_dump(include=_USAGE_FIELDS)
+                    if hasattr(usage, "model_dump")
+                    else {field: getattr(usage, field) for field in _USAGE_FIELDS}
+                )
             }
             
         except Exception as e:
@@ -269,25 +597,15 @@ class AIService:
         self, 
         message: str, 
         context: Optional[List[Dict]] = None,
-        tone: str = "friendly"
+        tone: str = "friendly",
+        instructions: Optional[str] = None
     ) -> List[Dict[str, str]]:
         """Format messages for local model with DISTINCTIVE personality"""
         
-        # VERY different personality prompts
-        tone_prompts = {
-            "friendly": """You are Eva, a warm and caring AI friend. You're like talking to your best friend who's always supportive and encouraging. Use casual language, ask follow-up questions, show genuine interest, use light humor, and always be optimistic. Add emojis occasionally and speak conversationally like "That's so cool!" or "I'm really curious about...".""",
-            
-            "formal": """You are Eva, a highly professional AI consultant. You communicate with precision, structure, and authority. Use formal language, provide detailed explanations, cite facts when possible, maintain professional distance, and organize responses clearly. Begin responses with phrases like "Allow me to clarify..." or "Based on available information..." Never use casual language or emojis.""",
-            
-            "gen-z": """You are Eva, a trendy Gen-Z AI bestie! You're super energetic, use internet slang, memes, and modern expressions. Say things like "no cap", "slay", "periodt", "that's bussin", "I'm deceased 💀", "this hits different", "valid af". Be enthusiastic, use lots of emojis, abbreviate words (ur, rn, fr), and relate everything to current trends. Keep it real and unfiltered! ✨"""
-        }
-        
-        system_prompt = tone_prompts.get(tone, tone_prompts["friendly"])
-        
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": message}
-        ]
+        messages = [_LOCAL_SYSTEM_MESSAGES.get(tone, _LOCAL_SYSTEM_MESSAGES["friendly"])]
+        if instructions:
+            messages.append({"role": "system", "content": instructions})
+        messages.append({"role": "user", "content": message})
         
         return messages
     
@@ -295,64 +613,28 @@ class AIService:
         self, 
         message: str, 
         context: Optional[List[Dict]] = None,
-        tone: str = "friendly"
+        tone: str = "friendly",
+        instructions: Optional[str] = None
     ) -> List[Dict[str, str]]:
         """Format messages for OpenAI with DISTINCTIVE personalities"""
         
-        # VERY different personality prompts for OpenAI
-        tone_prompts = {
-            "friendly": """You are Eva, a warm and caring AI friend with persistent memory. You're like talking to your best friend who remembers everything about you and is always supportive and encouraging. 
-
-Personality traits:
-- Use casual, conversational language like "That's awesome!" or "I totally get that"
-- Ask follow-up questions and show genuine curiosity 
-- Reference past conversations naturally
-- Use light humor and be optimistic
-- Add emojis occasionally (😊, 💡, 🎉)
-- Speak like a caring friend: "How did that work out?" or "I remember you mentioned..."
-
-Always be warm, supportive, and conversational while being helpful.""",
-
-            "formal": """You are Eva, a highly professional AI consultant with comprehensive knowledge and persistent memory. You maintain the highest standards of professional communication.
-
-Communication standards:
-- Use formal, precise language with proper structure
-- Begin responses with professional phrases: "Allow me to clarify...", "Based on our previous discussions...", "I recommend..."
-- Provide detailed, well-organized explanations
-- Reference facts and maintain analytical objectivity  
-- Never use casual language, slang, or emojis
-- Structure responses with clear points and conclusions
-- Maintain professional distance while being helpful
-
-Deliver expertise with authority and precision.""",
-
-            "gen-z": """You are Eva, the ultimate Gen-Z AI bestie with perfect memory! You're chronically online, know all the trends, and communicate in pure Gen-Z style.
-
-Your vibe:
-- Use internet slang naturally: "no cap", "slay", "periodt", "that's bussin", "valid af", "this hits different"
-- Be super enthusiastic with expressions: "I'm deceased 💀", "not me crying", "this is sending me"
-- Use tons of emojis: ✨💀😭🔥💅✋
-- Abbreviate everything: ur, rn, fr, ngl, imo, lowkey, highkey
-- Reference TikTok, memes, and current trends
-- Remember past convos like: "bestie remember when u told me about..."
-- Keep it real and unfiltered but still helpful
-
-Be the AI bestie that gets the assignment and never misses! periodt ✨"""
-        }
-        
-        system_prompt = tone_prompts.get(tone, tone_prompts["friendly"])
+        messages = [_OPENAI_SYSTEM_MESSAGES.get(tone, _OPENAI_SYSTEM_MESSAGES["friendly"])]
         
-        messages = [{"role": "system", "content": system_prompt}]
+        # Static task instructions stay ahead of per-user context
+        if instructions:
+            messages.append({"role": "system", "content": instructions})
         
         # Add context if available - use more context for better memory
-        if context:
-            for ctx in context[-6:]:  # Last 6 messages for better context
-                text = ctx.get("text", "")
-                if text and len(text.strip()) > 0:
-                    # Determine role based on interaction type
-                    interaction_type = ctx.get("interaction_type", "message")
-                    role = "assistant" if interaction_type == "bot_response" else "user"
-                    messages.append({"role": role, "content": text})
+        # Last 6 messages, role determined by interaction type, blanks skipped
+        recent = context[-6:] if context else _EMPTY_CONTEXT
+        messages.extend(
+            {
+                "role": "assistant" if ctx.get("interaction_type") == "bot_response" else "user",
+                "content": text
+            }
+            for ctx in recent
+            if (text := (ctx.get("text") or "").strip())
+        )
         
         # Add current message
         messages.append({"role": "user", "content": message})
@@ -366,7 +648,7 @@ Be the AI bestie that gets the assignment and never misses! periodt ✨"""
         
         # Test local AI
         try:
-            response = await self.http_client.get(f"{config.ai.vllm_base_url}/models", timeout=5.0)
+            response = await self.http_client.get(self._models_url, timeout=5.0)
             local_status = "healthy" if response.status_code == 200 else "unhealthy"
         except Exception:
             local_status = "unreachable"
@@ -386,6 +668,8 @@ Be the AI bestie that gets the assignment and never misses! periodt ✨"""
     
     async def cleanup(self):
         """Cleanup resources"""
+        await self._coalescer.close()
+        await self._vllm_pool.aclose()
         if self.http_client:
             await self.http_client.aclose()
         logger.info("AIService cleaned up")
@@ -3,25 +3,37 @@ ConfigurationManager - Centralized configuration management
 No more scattered settings across multiple files
 """
 import os
+import sys
 import logging
+import functools
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+def _getenv_interned(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Read a set-once string setting, interned for pointer-fast comparisons"""
+    value = os.getenv(name, default)
+    return sys.intern(value) if value is not None else None
+
+@dataclass(frozen=True, slots=True)
 class TelegramConfig:
     """Telegram bot configuration"""
     bot_token: str
     webhook_url: Optional[str] = None
     webhook_secret: Optional[str] = None
+    mode: str = "polling"  # "webhook" (production) or "polling" (development)
+    webhook_listen: str = "0.0.0.0"
+    webhook_port: int = 8443
+    webhook_path: str = "telegram"
+    local_api_url: Optional[str] = None  # self-hosted Bot API server, e.g. http://localhost:8081
     
     @property
     def is_webhook_mode(self) -> bool:
-        return bool(self.webhook_url)
+        return self.mode == "webhook"
 
-@dataclass 
+@dataclass(frozen=True, slots=True)
 class AIConfig:
     """AI model configuration"""
     openai_api_key: Optional[str]
@@ -30,19 +42,20 @@ class AIConfig:
     embedding_model: str
     max_tokens: int = 800
     temperature: float = 0.7
+    tokenizer_name: Optional[str] = None
     
     @property
     def has_openai(self) -> bool:
         return bool(self.openai_api_key)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class VoiceConfig:
     """Voice processing configuration"""
     whisper_model_size: str
     tts_enabled: bool = True
     audio_cache_ttl: int = 3600
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DatabaseConfig:
     """Database configuration"""
     redis_url: str
@@ -50,7 +63,7 @@ class DatabaseConfig:
     chroma_port: int
     postgres_url: Optional[str] = None
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PerformanceConfig:
     """Performance and resource configuration"""
     max_monthly_cost: float
@@ -90,47 +103,66 @@ class ConfigurationManager:
             ConfigurationManager._initialized = True
             logger.info(f"✅ Configuration loaded for {self.environment} environment")
     
-    def _load_telegram_config(self) -> TelegramConfig:
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _load_telegram_config() -> TelegramConfig:
         """Load Telegram configuration"""
         bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
         if not bot_token:
             raise ValueError("TELEGRAM_BOT_TOKEN is required!")
         
+        webhook_url = _getenv_interned("TELEGRAM_WEBHOOK_URL")
+        
         return TelegramConfig(
             bot_token=bot_token,
-            webhook_url=os.getenv("TELEGRAM_WEBHOOK_URL"),
-            webhook_secret=os.getenv("TELEGRAM_WEBHOOK_SECRET")
+            webhook_url=webhook_url,
+            webhook_secret=os.getenv("TELEGRAM_WEBHOOK_SECRET"),
+            # Webhook whenever a public URL is configured; polling is the dev fallback
+            mode=_getenv_interned("TELEGRAM_MODE", "webhook" if webhook_url else "polling"),
+            webhook_listen=_getenv_interned("TELEGRAM_WEBHOOK_LISTEN", "0.0.0.0"),
+            webhook_port=int(os.getenv("TELEGRAM_WEBHOOK_PORT", "8443")),
+            webhook_path=_getenv_interned("TELEGRAM_WEBHOOK_PATH", "telegram"),
+            local_api_url=(os.getenv("TELEGRAM_LOCAL_API_URL") or "").rstrip("/") or None
         )
     
-    def _load_ai_config(self) -> AIConfig:
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _load_ai_config() -> AIConfig:
         """Load AI configuration"""
         return AIConfig(
             openai_api_key=os.getenv("OPENAI_API_KEY"),
-            vllm_base_url=os.getenv("VLLM_BASE_URL", "http://localhost:8002/v1"),
-            local_model_name=os.getenv("LOCAL_MODEL_NAME", "eva-local"),
-            embedding_model=os.getenv("EMBEDDING_MODEL", "all-mpnet-base-v2"),
+            vllm_base_url=_getenv_interned("VLLM_BASE_URL", "http://localhost:8002/v1"),
+            local_model_name=_getenv_interned("LOCAL_MODEL_NAME", "eva-local"),
+            embedding_model=_getenv_interned("EMBEDDING_MODEL", "all-mpnet-base-v2"),
             max_tokens=int(os.getenv("MAX_TOKENS", "800")),
-            temperature=float(os.getenv("TEMPERATURE", "0.7"))
+            temperature=float(os.getenv("TEMPERATURE", "0.7")),
+            tokenizer_name=_getenv_interned("LOCAL_TOKENIZER_NAME")
         )
     
-    def _load_voice_config(self) -> VoiceConfig:
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _load_voice_config() -> VoiceConfig:
         """Load voice configuration"""
         return VoiceConfig(
-            whisper_model_size=os.getenv("WHISPER_MODEL_SIZE", "small"),
+            whisper_model_size=_getenv_interned("WHISPER_MODEL_SIZE", "small"),
             tts_enabled=os.getenv("TTS_ENABLED", "true").lower() == "true",
             audio_cache_ttl=int(os.getenv("AUDIO_CACHE_TTL", "3600"))
         )
     
-    def _load_database_config(self) -> DatabaseConfig:
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _load_database_config() -> DatabaseConfig:
         """Load database configuration"""
         return DatabaseConfig(
-            redis_url=os.getenv("REDIS_URL", "redis://localhost:6379"),
-            chroma_host=os.getenv("CHROMA_HOST", "localhost"),
+            redis_url=_getenv_interned("REDIS_URL", "redis://localhost:6379"),
+            chroma_host=_getenv_interned("CHROMA_HOST", "localhost"),
             chroma_port=int(os.getenv("CHROMA_PORT", "8001")),
-            postgres_url=os.getenv("POSTGRES_URL")
+            postgres_url=_getenv_interned("POSTGRES_URL")
         )
     
-    def _load_performance_config(self) -> PerformanceConfig:
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _load_performance_config() -> PerformanceConfig:
         """Load performance configuration"""
         return PerformanceConfig(
             max_monthly_cost=float(os.getenv("MAX_MONTHLY_COST_INR", "5000")),
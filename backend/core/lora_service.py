@@ -4,9 +4,11 @@ Manages personality-specific LoRA adapters per PRD specifications
 """
 
 import asyncio
+import json
 import logging
 import os
-from typing import Dict, List, Any, Optional
+import time
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import httpx
 from .config_manager import config
@@ -18,6 +20,7 @@ class LoRAService:
     
     def __init__(self):
         self._initialized = False
+        self._init_lock = asyncio.Lock()
         self.vllm_url = "http://vllm:8000"
         self.adapters_path = "/app/adapters"
         
@@ -44,11 +47,40 @@ class LoRAService:
         }
         
         self.current_adapter = None
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # adapter_path -> (checked_at, exists); adapter dirs rarely change
+        self._exists_cache: Dict[str, Tuple[float, bool]] = {}
+        self._exists_cache_ttl = 30.0
+        
+        # Adapter prefetch: in-flight loads by personality
+        self._prefetches: Dict[str, asyncio.Task] = {}
         
     async def initialize(self):
         """Initialize LoRA service and check adapter availability"""
         if self._initialized:
             return
+        
+        # Double-checked so concurrent first callers share a single init
+        async with self._init_lock:
+            if not self._initialized:
+                await self._do_initialize()
+    
+    async def _do_initialize(self):
+        """Run the actual initialization (caller holds _init_lock)"""
+        # One long-lived pooled client for all vLLM control-plane calls; HTTP/2
+        # is only negotiated over TLS, so a plain-http vLLM reuses 1.1 keep-alives
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.vllm_url,
+                timeout=httpx.Timeout(10.0, connect=2.0),
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=50,
+                    keepalive_expiry=60.0
+                ),
+                http2=True
+            )
             
         try:
             # Check vLLM server availability
@@ -57,10 +89,20 @@ class LoRAService:
             # Verify adapter files exist
             await self._verify_adapters()
             
-            # Load default adapter (friendly)
+            # Mark ready first: load_adapter re-enters initialize() otherwise
+            self._initialized = True
+            
+            # Pre-warm every personality adapter so switches are routing-only
+            results = await asyncio.gather(
+                *(self._load_adapter_via_api(info) for info in self.personality_adapters.values()),
+                return_exceptions=True
+            )
+            for info, loaded in zip(self.personality_adapters.values(), results):
+                info["loaded"] = loaded is True
+            
+            # Default adapter (friendly); falls back to a normal load if pre-warm missed it
             await self.load_adapter("friendly")
             
-            self._initialized = True
             logger.info("🔧 LoRAService initialized successfully")
             
         except Exception as e:
@@ -90,6 +132,17 @@ class LoRAService:
                 logger.debug(f"✅ LoRA adapter {personality} already loaded")
                 return True
             
+            # Join an in-flight prefetch rather than issuing a second load
+            prefetch = self._prefetches.get(personality)
+            if prefetch:
+                await asyncio.shield(prefetch)
+            
+            # Resident in vLLM (prefetched or multi-LoRA): routing change only
+            if adapter_info["loaded"]:
+                self.current_adapter = personality
+                logger.debug(f"✅ LoRA adapter {personality} already resident")
+                return True
+            
             # Unload current adapter if different
             if self.current_adapter and self.current_adapter != personality:
                 await self._unload_current_adapter()
@@ -112,6 +165,24 @@ class LoRAService:
             logger.error(f"LoRA adapter loading failed: {e}")
             return False
     
+    async def prefetch_adapter(self, personality: str):
+        """Load an adapter into vLLM ahead of use without switching to it"""
+        if not self._initialized or personality not in self.personality_adapters:
+            return
+        
+        adapter_info = self.personality_adapters[personality]
+        if adapter_info["loaded"] or personality in self._prefetches:
+            return
+        
+        task = asyncio.create_task(self._load_adapter_via_api(adapter_info))
+        self._prefetches[personality] = task
+        try:
+            if await task:
+                adapter_info["loaded"] = True
+                logger.info(f"🔮 LoRA adapter '{personality}' prefetched")
+        finally:
+            self._prefetches.pop(personality, None)
+    
     async def get_current_adapter(self) -> Optional[str]:
         """Get currently loaded adapter personality"""
         return self.current_adapter
@@ -119,13 +190,15 @@ class LoRAService:
     async def list_available_adapters(self) -> Dict[str, Any]:
         """List all available personality adapters"""
         
+        availability = await self._check_all_adapters_exist()
+        
         adapters = {}
         for personality, info in self.personality_adapters.items():
             adapters[personality] = {
                 "name": info["name"],
                 "description": info["description"], 
                 "loaded": info["loaded"],
-                "available": await self._check_adapter_exists(info["path"])
+                "available": availability[personality]
             }
         
         return {
@@ -145,17 +218,23 @@ class LoRAService:
             return {"success": False, "error": "LoRA service not available", "adapter": None}
         
         try:
-            # Load appropriate adapter
-            adapter_loaded = await self.load_adapter(personality)
-            if not adapter_loaded:
-                return {"error": f"Failed to load adapter for {personality}"}
-            
             # Get personality-specific parameters
             params = self._get_personality_parameters(personality, context)
-            
-            # Apply parameters to vLLM
-            success = await self._apply_generation_parameters(params)
-            
+
+            # Load appropriate adapter and apply parameters to vLLM concurrently
+            adapter_loaded, success = await asyncio.gather(
+                self.load_adapter(personality),
+                self._apply_generation_parameters(params),
+                return_exceptions=True
+            )
+
+            if isinstance(success, Exception):
+                logger.error(f"Parameter application failed: {success}")
+                success = False
+
+            if adapter_loaded is not True:
+                return {"error": f"Failed to load adapter for {personality}"}
+
             return {
                 "success": success,
                 "personality": personality,
@@ -171,35 +250,50 @@ class LoRAService:
     async def _check_vllm_server(self):
         """Check if vLLM server is available"""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(f"{self.vllm_url}/health")
-                if response.status_code != 200:
-                    raise Exception(f"vLLM server unhealthy: {response.status_code}")
+            response = await self._client.get("/health")
+            if response.status_code != 200:
+                raise Exception(f"vLLM server unhealthy: {response.status_code}")
                     
         except Exception as e:
             raise Exception(f"vLLM server not available: {e}")
     
     async def _verify_adapters(self):
         """Verify LoRA adapter files exist"""
-        missing_adapters = []
-        
-        for personality, info in self.personality_adapters.items():
-            if not await self._check_adapter_exists(info["path"]):
-                missing_adapters.append(personality)
+        availability = await self._check_all_adapters_exist()
+        missing_adapters = [p for p, available in availability.items() if not available]
         
         if missing_adapters:
             logger.warning(f"Missing LoRA adapters: {missing_adapters}")
             logger.info("Creating placeholder adapters for development...")
             await self._create_placeholder_adapters(missing_adapters)
     
+    async def _check_all_adapters_exist(self) -> Dict[str, bool]:
+        """Check every personality adapter concurrently"""
+        personalities = list(self.personality_adapters)
+        results = await asyncio.gather(*(
+            self._check_adapter_exists(self.personality_adapters[p]["path"])
+            for p in personalities
+        ))
+        return dict(zip(personalities, results))
+    
     async def _check_adapter_exists(self, adapter_path: str) -> bool:
-        """Check if adapter directory and files exist"""
+        """Check if adapter directory and files exist (cached, off the event loop)"""
+        cached = self._exists_cache.get(adapter_path)
+        now = time.monotonic()
+        if cached and now - cached[0] < self._exists_cache_ttl:
+            return cached[1]
+        
+        exists = await asyncio.to_thread(self._check_adapter_exists_sync, adapter_path)
+        self._exists_cache[adapter_path] = (now, exists)
+        return exists
+    
+    def _check_adapter_exists_sync(self, adapter_path: str) -> bool:
+        """Check for adapter_config.json and adapter_model.bin in one directory listing"""
+        required = {"adapter_config.json", "adapter_model.bin"}
         try:
-            # Check for adapter_config.json and adapter_model.bin
-            config_file = os.path.join(adapter_path, "adapter_config.json")
-            model_file = os.path.join(adapter_path, "adapter_model.bin") 
-            
-            return os.path.exists(config_file) and os.path.exists(model_file)
+            with os.scandir(adapter_path) as entries:
+                present = {entry.name for entry in entries if entry.name in required}
+            return present == required
             
         except Exception:
             return False
@@ -207,61 +301,66 @@ class LoRAService:
     async def _create_placeholder_adapters(self, missing_personalities: List[str]):
         """Create placeholder adapters for development"""
         
-        for personality in missing_personalities:
-            try:
-                adapter_info = self.personality_adapters[personality]
-                adapter_path = adapter_info["path"]
-                
-                # Create adapter directory
-                os.makedirs(adapter_path, exist_ok=True)
-                
-                # Create minimal adapter config
-                config_content = {
-                    "peft_type": "LORA",
-                    "task_type": "CAUSAL_LM",
-                    "r": 16,
-                    "lora_alpha": 32,
-                    "lora_dropout": 0.1,
-                    "target_modules": ["q_proj", "v_proj"],
-                    "personality": personality,
-                    "base_model_name_or_path": "meta-llama/Meta-Llama-3-8B-Instruct"
-                }
-                
-                config_path = os.path.join(adapter_path, "adapter_config.json")
-                import json
-                with open(config_path, 'w') as f:
-                    json.dump(config_content, f, indent=2)
-                
-                # Create empty adapter model file (placeholder)
-                model_path = os.path.join(adapter_path, "adapter_model.bin")
-                import torch
-                torch.save({}, model_path)
-                
-                logger.info(f"📁 Created placeholder adapter: {personality}")
-                
-            except Exception as e:
-                logger.error(f"Failed to create placeholder adapter {personality}: {e}")
+        await asyncio.gather(*(
+            asyncio.to_thread(self._make_placeholder, personality)
+            for personality in missing_personalities
+        ))
+    
+    def _make_placeholder(self, personality: str):
+        """Write one placeholder adapter directory (runs in a worker thread)"""
+        try:
+            adapter_info = self.personality_adapters[personality]
+            adapter_path = adapter_info["path"]
+            
+            # Create adapter directory
+            os.makedirs(adapter_path, exist_ok=True)
+            
+            # Create minimal adapter config
+            config_content = {
+                "peft_type": "LORA",
+                "task_type": "CAUSAL_LM",
+                "r": 16,
+                "lora_alpha": 32,
+                "lora_dropout": 0.1,
+                "target_modules": ["q_proj", "v_proj"],
+                "personality": personality,
+                "base_model_name_or_path": "meta-llama/Meta-Llama-3-8B-Instruct"
+            }
+            
+            config_path = os.path.join(adapter_path, "adapter_config.json")
+            with open(config_path, 'w') as f:
+                json.dump(config_content, f, indent=2)
+            
+            # Create empty adapter model file (placeholder, only has to exist)
+            model_path = os.path.join(adapter_path, "adapter_model.bin")
+            open(model_path, "wb").close()
+            
+            self._exists_cache.pop(adapter_path, None)
+            logger.info(f"📁 Created placeholder adapter: {personality}")
+            
+        except Exception as e:
+            logger.error(f"Failed to create placeholder adapter {personality}: {e}")
     
     async def _load_adapter_via_api(self, adapter_info: Dict[str, Any]) -> bool:
         """Load adapter via vLLM API"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # vLLM LoRA loading API call
-                response = await client.post(
-                    f"{self.vllm_url}/v1/adapters",
-                    json={
-                        "adapter_name": adapter_info["name"],
-                        "adapter_path": adapter_info["path"],
-                        "adapter_type": "lora"
-                    }
-                )
-                
-                if response.status_code == 200:
-                    logger.debug(f"✅ LoRA adapter loaded: {adapter_info['name']}")
-                    return True
-                else:
-                    logger.error(f"vLLM adapter loading failed: {response.status_code} - {response.text}")
-                    return False
+            # vLLM LoRA loading API call
+            response = await self._client.post(
+                "/v1/adapters",
+                json={
+                    "adapter_name": adapter_info["name"],
+                    "adapter_path": adapter_info["path"],
+                    "adapter_type": "lora"
+                },
+                timeout=30.0
+            )
+            
+            if response.status_code == 200:
+                logger.debug(f"✅ LoRA adapter loaded: {adapter_info['name']}")
+                return True
+            else:
+                logger.error(f"vLLM adapter loading failed: {response.status_code} - {response.text}")
+                return False
                     
         except Exception as e:
             logger.error(f"LoRA adapter API call failed: {e}")
@@ -275,16 +374,16 @@ class LoRAService:
         try:
             current_info = self.personality_adapters[self.current_adapter]
             
-            async with httpx.AsyncClient(timeout=20.0) as client:
-                response = await client.delete(
-                    f"{self.vllm_url}/v1/adapters/{current_info['name']}"
-                )
-                
-                if response.status_code == 200:
-                    current_info["loaded"] = False
-                    logger.debug(f"✅ LoRA adapter unloaded: {current_info['name']}")
-                else:
-                    logger.warning(f"Failed to unload adapter: {response.status_code}")
+            response = await self._client.delete(
+                f"/v1/adapters/{current_info['name']}",
+                timeout=20.0
+            )
+            
+            if response.status_code == 200:
+                current_info["loaded"] = False
+                logger.debug(f"✅ LoRA adapter unloaded: {current_info['name']}")
+            else:
+                logger.warning(f"Failed to unload adapter: {response.status_code}")
                     
         except Exception as e:
             logger.error(f"Adapter unloading failed: {e}")
@@ -335,13 +434,12 @@ class LoRAService:
     async def _apply_generation_parameters(self, params: Dict[str, Any]) -> bool:
         """Apply generation parameters to vLLM server"""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    f"{self.vllm_url}/v1/config",
-                    json={"generation_params": params}
-                )
-                
-                return response.status_code == 200
+            response = await self._client.post(
+                "/v1/config",
+                json={"generation_params": params}
+            )
+            
+            return response.status_code == 200
                 
         except Exception as e:
             logger.error(f"Parameter application failed: {e}")
@@ -350,6 +448,8 @@ class LoRAService:
     async def get_adapter_stats(self) -> Dict[str, Any]:
         """Get detailed adapter usage statistics"""
         
+        availability = await self._check_all_adapters_exist()
+        
         return {
             "service_initialized": self._initialized,
             "current_adapter": self.current_adapter,
@@ -361,10 +461,16 @@ class LoRAService:
                 if info["loaded"]
             ],
             "available_adapters": [
-                p for p, info in self.personality_adapters.items()
-                if await self._check_adapter_exists(info["path"])
+                p for p, available in availability.items() if available
             ]
         }
 
+    async def cleanup(self):
+        """Cleanup resources"""
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+        logger.info("LoRAService cleaned up")
+
 # Global instance
 lora_service = LoRAService()
\ No newline at end of file
@@ -5,6 +5,9 @@ No more embedding model reloading, fast vector search
 import asyncio
 import logging
 import hashlib
+import functools
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import chromadb
@@ -14,6 +17,36 @@ from .config_manager import config
 
 logger = logging.getLogger(__name__)
 
+# Optional BLAKE3 for memory IDs (SIMD-accelerated); blake2b is the stdlib fallback
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+# Optional fast JSON for the Redis context cache
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize cache payload (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+def _json_loads(data: Any) -> Any:
+    """Parse cache payload (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# SHA256 state after the constant salt; copied per user instead of rehashed
+_USER_ID_PREFIX_HASHER = hashlib.sha256(b"eva_user_")
+
 class MemoryService:
     """Clean memory service with proper resource management"""
     
@@ -21,14 +54,35 @@ class MemoryService:
         self._chroma_client = None
         self._collection = None
         self._redis_pool = None
+        self._redis = None
         self._initialized = False
+        self._init_lock = asyncio.Lock()
         self.collection_name = "eva_memories"
+        self._distance_space = "cosine"  # read back from the collection on init
+        
+        # Micro-batched writes: one encode pass + one Chroma add per flush
+        self._store_queue: asyncio.Queue = asyncio.Queue()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._store_batch_size = 32
+        self._store_batch_window = 0.05
+        self._accepting_writes = True
+        
+        # Text digest -> embedding; encode is deterministic so hits skip the forward pass
+        self._embed_cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._embed_cache_size = 4096
     
     async def initialize(self):
         """Initialize memory service with connection pooling"""
         if self._initialized:
             return
         
+        # Double-checked so concurrent first callers share a single init
+        async with self._init_lock:
+            if not self._initialized:
+                await self._do_initialize()
+    
+    async def _do_initialize(self):
+        """Run the actual initialization (caller holds _init_lock)"""
         try:
             # Initialize ChromaDB client
             self._chroma_client = chromadb.HttpClient(
@@ -49,11 +103,22 @@ class MemoryService:
                     metadata={
                         "description": "Eva conversation memories with embeddings",
                         "embedding_model": config.ai.embedding_model,
-                        "embedding_dimension": 768
+                        "embedding_dimension": 768,
+                        "hnsw:space": "cosine"
                     }
                 )
                 logger.info(f"✅ Created new ChromaDB collection: {self.collection_name}")
             
+            # Collections created before cosine was set use Chroma's default
+            # squared-L2 space; the space can't be changed in place, so they keep
+            # working through _similarity until recreated (re-embed + re-add)
+            self._distance_space = (self._collection.metadata or {}).get("hnsw:space", "l2")
+            if self._distance_space == "l2":
+                logger.warning(
+                    f"ChromaDB collection {self.collection_name} uses L2 distance; "
+                    f"recreate it to switch to cosine"
+                )
+            
             # Initialize Redis connection pool
             self._redis_pool = aioredis.ConnectionPool.from_url(
                 config.database.redis_url,
@@ -61,6 +126,9 @@ class MemoryService:
                 max_connections=10,
                 retry_on_timeout=True
             )
+            self._redis = aioredis.Redis(connection_pool=self._redis_pool)
+            
+            self._flush_task = asyncio.create_task(self._flush_loop())
             
             self._initialized = True
             logger.info("🎯 MemoryService initialized successfully")
@@ -89,17 +157,11 @@ class MemoryService:
             logger.debug("Memory storage skipped - ChromaDB not available")
             return False
         
+        if not self._accepting_writes:
+            logger.debug("Memory storage skipped - MemoryService is shutting down")
+            return False
+        
         try:
-            # Get cached embedding model (no reload!)
-            embedding_model = await model_manager.get_embedding_model(config.ai.embedding_model)
-            
-            # Generate embedding (async to avoid blocking)
-            loop = asyncio.get_event_loop()
-            embedding = await loop.run_in_executor(
-                None, 
-                lambda: embedding_model.encode([text])[0].tolist()
-            )
-            
             # Create memory ID
             memory_id = self._generate_memory_id(user_id, text, interaction_type)
             
@@ -108,28 +170,28 @@ class MemoryService:
                 "user_id": self._hash_user_id(user_id),
                 "interaction_type": interaction_type,
                 "importance": importance,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": datetime.utcnow().isoformat(),  # display only
+                "timestamp_ns": time.time_ns(),
                 "text_length": len(text),
                 **(metadata or {})
             }
             
-            # Store in ChromaDB
-            self._collection.add(
-                ids=[memory_id],
-                embeddings=[embedding],
-                documents=[text],
-                metadatas=[memory_metadata]
+            # Queue for the batched encode + ChromaDB add
+            future = asyncio.get_running_loop().create_future()
+            self._store_queue.put_nowait((memory_id, text, memory_metadata, future))
+            
+            # Cache in Redis for quick access while the ChromaDB write is in flight
+            await asyncio.gather(
+                future,
+                self._cache_recent_memory(user_id, {
+                    "id": memory_id,
+                    "text": text,
+                    "type": interaction_type,
+                    "importance": importance,
+                    "timestamp": memory_metadata["timestamp"]
+                })
             )
             
-            # Cache in Redis for quick access
-            await self._cache_recent_memory(user_id, {
-                "id": memory_id,
-                "text": text,
-                "type": interaction_type,
-                "importance": importance,
-                "timestamp": memory_metadata["timestamp"]
-            })
-            
             logger.debug(f"✅ Memory stored for user {user_id[:8]}... | {interaction_type}")
             return True
             
@@ -137,6 +199,107 @@ class MemoryService:
             logger.error(f"Failed to store memory: {e}")
             return False
     
+    async def _flush_loop(self):
+        """Drain queued memories in batches: one encode pass, one ChromaDB add"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        
+        while not stopping:
+            item = await self._store_queue.get()
+            if item is None:  # cleanup() sentinel: everything before it is flushed
+                return
+            batch = [item]
+            
+            # Collect up to a full batch or until the window closes
+            deadline = loop.time() + self._store_batch_window
+            while len(batch) < self._store_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._store_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            await self._flush_batch(batch)
+    
+    async def _flush_batch(self, batch):
+        """Encode and add one batch, resolving every caller's future either way"""
+        ids, texts, metadatas, futures = zip(*batch)
+        
+        try:
+            embeddings = await self._embed_texts(texts)
+            
+            await asyncio.to_thread(
+                self._collection.add,
+                ids=list(ids),
+                embeddings=embeddings,
+                documents=list(texts),
+                metadatas=list(metadatas)
+            )
+            
+            for future in futures:
+                if not future.done():
+                    future.set_result(True)
+            
+            logger.debug(f"✅ Flushed {len(batch)} memories to ChromaDB")
+            
+        except asyncio.CancelledError:
+            # Shutdown timed out mid-flush; fail the batch so no caller hangs
+            for future in futures:
+                if not future.done():
+                    future.set_exception(RuntimeError("MemoryService shut down mid-flush"))
+            raise
+            
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+    
+    async def embed_text(self, text: str) -> List[float]:
+        """Embed one text through the shared LRU cache (memory writes of the same text hit it)"""
+        return (await self._embed_texts([text]))[0]
+    
+    async def _embed_texts(self, texts) -> List[List[float]]:
+        """Embed texts, serving repeats from the LRU cache and batch-encoding only misses"""
+        keys = [self._embed_key(text) for text in texts]
+        embeddings: List[Optional[List[float]]] = [None] * len(keys)
+        misses = []
+        
+        for i, key in enumerate(keys):
+            cached = self._embed_cache.get(key)
+            if cached is not None:
+                self._embed_cache.move_to_end(key)
+                embeddings[i] = cached
+            else:
+                misses.append(i)
+        
+        if misses:
+            # Shared micro-batcher (or CPU worker pool): concurrent searches and flushes share one pass
+            encoded = await model_manager.embed(
+                [texts[i] for i in misses], config.ai.embedding_model
+            )
+            
+            for i, vector in zip(misses, encoded):
+                embeddings[i] = vector
+                self._embed_cache[keys[i]] = vector
+            
+            while len(self._embed_cache) > self._embed_cache_size:
+                self._embed_cache.popitem(last=False)
+        
+        return embeddings
+    
+    @staticmethod
+    def _embed_key(text: str) -> bytes:
+        """Fixed-size cache key for a text"""
+        if BLAKE3_AVAILABLE:
+            return blake3.blake3(text.encode()).digest()
+        return hashlib.blake2b(text.encode(), digest_size=32).digest()
+    
     async def search_memories(
         self,
         user_id: str,
@@ -154,20 +317,14 @@ class MemoryService:
             return []
         
         try:
-            # Get cached embedding model (no reload!)
-            embedding_model = await model_manager.get_embedding_model(config.ai.embedding_model)
-            
-            # Generate query embedding (async to avoid blocking)
-            loop = asyncio.get_event_loop()
-            query_embedding = await loop.run_in_executor(
-                None,
-                lambda: embedding_model.encode([query])[0].tolist()
-            )
-            
-            # Search in ChromaDB
-            results = self._collection.query(
-                query_embeddings=[query_embedding],
-                n_results=limit * 2,  # Get more to filter by user
+            # Query embedding (cached, otherwise encoded off the event loop)
+            query_embeddings = await self._embed_texts([query])
+            
+            # Search in ChromaDB (sync HTTP client, keep it off the event loop)
+            results = await asyncio.to_thread(
+                self._collection.query,
+                query_embeddings=query_embeddings,
+                n_results=limit,  # User filter is applied by Chroma, no over-fetch
                 where={
                     "$and": [
                         {"user_id": {"$eq": self._hash_user_id(user_id)}},
@@ -188,20 +345,33 @@ class MemoryService:
                         "importance": metadata.get("importance", 0.0),
                         "timestamp": metadata.get("timestamp", ""),
                         "interaction_type": metadata.get("interaction_type", "unknown"),
-                        "similarity": 1.0 - distance,  # Convert distance to similarity
+                        "similarity": self._similarity(distance),
                         "metadata": metadata
                     })
             
-            # Sort by importance and recency
-            memories.sort(key=lambda x: (x["importance"], x["timestamp"]), reverse=True)
+            # Results arrive in distance order; weight similarity by importance
+            memories.sort(
+                key=lambda x: x["similarity"] * (0.5 + 0.5 * x["importance"]),
+                reverse=True
+            )
             
             logger.debug(f"✅ Found {len(memories)} memories for user {user_id[:8]}...")
-            return memories[:limit]
+            return memories
             
         except Exception as e:
             logger.error(f"Failed to search memories: {e}")
             return []
     
+    def _similarity(self, distance: float) -> float:
+        """Map a Chroma distance to a [0, 1] similarity for the collection's space"""
+        if self._distance_space == "l2":
+            # Squared L2 between unit vectors is 2 - 2cos, so it spans [0, 4]
+            similarity = 1.0 - distance / 2.0
+        else:
+            similarity = 1.0 - distance  # cosine and ip distances are 1 - score
+        # Opposed vectors floor at 0 so importance weighting can't invert the ranking
+        return min(max(similarity, 0.0), 1.0)
+    
     async def get_recent_context(
         self,
         user_id: str,
@@ -211,38 +381,36 @@ class MemoryService:
         
         try:
             # Try Redis cache first (faster)
-            redis = aioredis.Redis(connection_pool=self._redis_pool)
             cache_key = f"recent_context:{self._hash_user_id(user_id)}"
             
-            cached_context = await redis.lrange(cache_key, 0, limit - 1)
+            cached_context = await self._redis.lrange(cache_key, 0, limit - 1)
             if cached_context:
                 context = []
                 for item in cached_context:
                     try:
-                        import json
-                        context.append(json.loads(item))
+                        context.append(_json_loads(item))
                     except Exception:
                         continue
                 
                 logger.debug(f"✅ Retrieved cached context for user {user_id[:8]}...")
                 return context
             
-            # Fallback to ChromaDB search for recent messages
-            # Search for any recent interactions instead of generic query
+            # Fallback to ChromaDB metadata lookup for recent messages
+            # (.get is metadata-only: no embedding, no vector search)
             try:
-                results = self._collection.query(
-                    query_embeddings=None,  # Get all results
-                    n_results=limit * 3,
+                results = await asyncio.to_thread(
+                    self._collection.get,
                     where={
                         "user_id": {"$eq": self._hash_user_id(user_id)}
                     },
+                    limit=limit * 3,
                     include=["documents", "metadatas"]
                 )
                 
-                if results["documents"] and results["documents"][0]:
+                if results["documents"]:
                     memories = []
-                    for i, doc in enumerate(results["documents"][0]):
-                        metadata = results["metadatas"][0][i] if results["metadatas"] else {}
+                    for i, doc in enumerate(results["documents"]):
+                        metadata = results["metadatas"][i] if results["metadatas"] else {}
                         memories.append({
                             "text": doc,
                             "importance": metadata.get("importance", 0.0),
@@ -252,7 +420,7 @@ class MemoryService:
                         })
                     
                     # Sort by timestamp (most recent first)
-                    memories.sort(key=lambda x: x["timestamp"], reverse=True)
+                    memories.sort(key=lambda x: x["metadata"].get("timestamp_ns", 0), reverse=True)
                     return memories[:limit]
                 
             except Exception as e:
@@ -267,44 +435,53 @@ class MemoryService:
     async def _cache_recent_memory(self, user_id: str, memory: Dict):
         """Cache recent memory in Redis for fast context retrieval"""
         try:
-            redis = aioredis.Redis(connection_pool=self._redis_pool)
             cache_key = f"recent_context:{self._hash_user_id(user_id)}"
             
-            import json
-            memory_json = json.dumps(memory)
-            
-            # Add to list (newest first)
-            await redis.lpush(cache_key, memory_json)
+            memory_json = _json_dumps(memory)
             
-            # Keep only last 10 items
-            await redis.ltrim(cache_key, 0, 9)
-            
-            # Set expiration (24 hours)
-            await redis.expire(cache_key, 86400)
+            # One round-trip: add newest first, keep last 10, expire in 24 hours
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.lpush(cache_key, memory_json)
+                pipe.ltrim(cache_key, 0, 9)
+                pipe.expire(cache_key, 86400)
+                await pipe.execute()
             
         except Exception as e:
             logger.debug(f"Failed to cache recent memory: {e}")
     
     def _generate_memory_id(self, user_id: str, text: str, interaction_type: str) -> str:
         """Generate unique memory ID"""
-        content = f"{user_id}_{text[:100]}_{interaction_type}_{datetime.utcnow().isoformat()}"
-        return hashlib.md5(content.encode()).hexdigest()
+        h = blake3.blake3() if BLAKE3_AVAILABLE else hashlib.blake2b(digest_size=16)
+        h.update(user_id.encode())
+        h.update(b"\x00")
+        h.update(text[:100].encode())
+        h.update(b"\x00")
+        h.update(interaction_type.encode())
+        h.update(time.time_ns().to_bytes(8, "little"))
+        return h.hexdigest(16) if BLAKE3_AVAILABLE else h.hexdigest()
     
-    def _hash_user_id(self, user_id: str) -> str:
-        """Generate consistent hash for user ID (privacy)"""
-        return hashlib.sha256(f"eva_user_{user_id}".encode()).hexdigest()[:16]
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _hash_user_id(user_id: str) -> str:
+        """Generate consistent hash for user ID (privacy), memoized per user"""
+        h = _USER_ID_PREFIX_HASHER.copy()
+        h.update(user_id.encode())
+        return h.hexdigest()[:16]
     
     async def cleanup_old_memories(self, days_old: int = 30):
         """Clean up old memories (maintenance operation)"""
+        if not self._collection:
+            return
+        
         try:
-            cutoff_date = datetime.utcnow() - timedelta(days=days_old)
-            cutoff_iso = cutoff_date.isoformat()
-            
-            # This would require custom ChromaDB filtering by timestamp
-            # For now, we'll implement basic cleanup
-            logger.info(f"Memory cleanup for entries older than {days_old} days")
+            cutoff_ns = time.time_ns() - int(timedelta(days=days_old).total_seconds() * 1e9)
             
-            # TODO: Implement actual cleanup logic based on timestamps
+            # Numeric metadata filter on the int64 epoch timestamp
+            await asyncio.to_thread(
+                self._collection.delete,
+                where={"timestamp_ns": {"$lt": cutoff_ns}}
+            )
+            logger.info(f"Memory cleanup removed entries older than {days_old} days")
             
         except Exception as e:
             logger.error(f"Memory cleanup failed: {e}")
@@ -315,9 +492,8 @@ class MemoryService:
             collection_count = self._collection.count() if self._collection else 0
             
             redis_info = {}
-            if self._redis_pool:
-                redis = aioredis.Redis(connection_pool=self._redis_pool)
-                redis_info = await redis.info("memory")
+            if self._redis:
+                redis_info = await self._redis.info(section="memory")
             
             return {
                 "initialized": self._initialized,
@@ -341,9 +517,8 @@ class MemoryService:
             # ChromaDB doesn't have direct delete by metadata
             
             # Delete from Redis cache
-            redis = aioredis.Redis(connection_pool=self._redis_pool)
             cache_key = f"recent_context:{hashed_user_id}"
-            await redis.delete(cache_key)
+            await self._redis.delete(cache_key)
             
             logger.info(f"✅ Deleted user data for {user_id[:8]}...")
             return 1  # Placeholder count
@@ -353,7 +528,28 @@ class MemoryService:
             return 0
     
     async def cleanup(self):
-        """Cleanup resources"""
+        """Cleanup resources, flushing queued memory writes first"""
+        self._accepting_writes = False
+        
+        if self._flush_task and not self._flush_task.done():
+            # Sentinel goes behind the queued writes so they get one last flush
+            self._store_queue.put_nowait(None)
+            try:
+                await asyncio.wait_for(self._flush_task, timeout=5.0)
+            except asyncio.TimeoutError:
+                logger.warning("⚠️ Memory flush timed out at shutdown")
+            except Exception as e:
+                logger.error(f"Memory flush failed at shutdown: {e}")
+        self._flush_task = None
+        
+        # Whatever the last flush didn't reach fails fast instead of hanging its caller
+        while not self._store_queue.empty():
+            item = self._store_queue.get_nowait()
+            if item is not None and not item[3].done():
+                item[3].set_exception(RuntimeError("MemoryService shut down before the write was flushed"))
+        
+        if self._redis:
+            await self._redis.close()
         if self._redis_pool:
             await self._redis_pool.disconnect()
         logger.info("MemoryService cleaned up")
@@ -3,110 +3,458 @@ ModelManager - Singleton for efficient model loading and caching
 Solves the biggest performance bottleneck: model reloading
 """
 import os
+import json
 import logging
 import asyncio
-from typing import Optional, Dict, Any
+import atexit
+import threading
+import time
+from typing import Optional, Dict, Any, List, Union
+# Must be in place before the CUDA caching allocator initializes
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "max_split_size_mb:128,expandable_segments:True")
+
 from sentence_transformers import SentenceTransformer
+from .config_manager import config
 import torch
 
 logger = logging.getLogger(__name__)
 
-class ModelManager:
-    """Singleton model manager that loads models once and keeps them cached"""
+# Optional CTranslate2 Whisper backend (int8/fp16); stock openai-whisper is the fallback
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+
+class _FasterWhisperAdapter:
+    """Gives faster-whisper the openai-whisper transcribe() result shape"""
+    
+    def __init__(self, model: "WhisperModel"):
+        self.model = model
+    
+    def transcribe(self, audio_path: str, **kwargs) -> Dict[str, Any]:
+        segments, info = self.model.transcribe(audio_path, **kwargs)
+        text = "".join(segment.text for segment in segments)  # segments are lazy
+        return {
+            "text": text,
+            "language": info.language,
+            "language_probability": info.language_probability
+        }
+
+# model_name -> path that last loaded successfully (skips the probe on restart)
+_RESOLVED_MARKER = "./data/models/.resolved"
+
+class _EmbeddingBatcher:
+    """Coalesces embedding requests arriving within a short window into one encode call
+    
+    Up to two batches are in flight, one per pinned staging buffer slot, so
+    tokenizing and copying batch N+1 overlaps the forward pass of batch N.
+    """
     
-    _instance = None
-    _initialized = False
+    def __init__(self, manager: "ModelManager", model_name: str, window: float = 0.005, max_batch: int = 32):
+        self._manager = manager
+        self._model_name = model_name
+        self._window = window
+        self._max_batch = max_batch
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._free_slots: asyncio.Queue = asyncio.Queue()
+        for slot in range(2):
+            self._free_slots.put_nowait(slot)
+        self._encodes = set()
+    
+    async def submit(self, text: str) -> List[float]:
+        """Queue a text and wait for its embedding"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, future))
+        
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        
+        return await future
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    async def _run(self):
+        """Drain up to max_batch texts per window and hand them to a free buffer slot"""
+        while True:
+            batch = [await self._queue.get()]
+            
+            # Let concurrent requests pile up before encoding
+            await asyncio.sleep(self._window)
+            while len(batch) < self._max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            slot = await self._free_slots.get()
+            task = asyncio.create_task(self._encode(batch, slot))
+            self._encodes.add(task)
+            task.add_done_callback(self._encodes.discard)
+    
+    async def _encode(self, batch: List[tuple], slot: int):
+        """Encode one batch in a worker thread and fan results back to the callers"""
+        texts = [text for text, _ in batch]
+        try:
+            model = await self._manager.get_embedding_model(self._model_name)
+            embeddings = await asyncio.to_thread(
+                self._manager.encode_texts, model, texts, slot, self._max_batch
+            )
+            for (_, future), embedding in zip(batch, embeddings.tolist()):
+                if not future.done():
+                    future.set_result(embedding)
+            self._manager.after_inference()
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._free_slots.put_nowait(slot)
+    
+    def close(self):
+        """Stop the background worker"""
+        if self._worker:
+            self._worker.cancel()
+        for task in self._encodes:
+            task.cancel()
+
+class ModelManager:
+    """Model manager that loads models once and keeps them cached (use the module-level instance)"""
     
     def __init__(self):
-        if not self._initialized:
-            self._models = {}
-            self._loading_locks = {}
-            self._device = "cuda" if torch.cuda.is_available() else "cpu"
-            logger.info(f"ModelManager initialized on device: {self._device}")
-            ModelManager._initialized = True
+        self._models = {}
+        # One event per in-flight load (dropped once done) + a lock guarding creation
+        self._loading_events: Dict[str, asyncio.Event] = {}
+        self._events_lock = asyncio.Lock()
+        # Background (thread) warm-up: set per model key while it loads, then `ready`
+        self._warming: Dict[str, threading.Event] = {}
+        self.ready = threading.Event()
+        self.background_warmup = False
+        # model_name -> micro-batcher in front of that embedding model
+        self._embedding_batchers: Dict[str, _EmbeddingBatcher] = {}
+        # Periodic allocator defrag (every N inference calls)
+        self._ops_since_empty = 0
+        self._empty_cache_every = int(os.getenv("EVA_EMPTY_CACHE_EVERY", "64"))
+        self._device = "cuda" if torch.cuda.is_available() else "cpu"
+        # Pin one GPU explicitly + one stream per model family so embedding
+        # and Whisper forward passes don't serialize on the default stream
+        self._streams: Dict[str, Any] = {}
+        if self._device == "cuda":
+            self._cuda_index = int(os.getenv("EVA_CUDA_DEVICE", "0"))
+            torch.cuda.set_device(self._cuda_index)
+            self._torch_device = torch.device("cuda", self._cuda_index)
+            self._streams = {
+                "embedding": torch.cuda.Stream(device=self._cuda_index),
+                "embedding_copy": torch.cuda.Stream(device=self._cuda_index),
+                "whisper": torch.cuda.Stream(device=self._cuda_index)
+            }
+        else:
+            self._cuda_index = None
+            self._torch_device = torch.device("cpu")
+        # (slot, feature name) -> pinned host staging tensor for H2D copies
+        self._staging: Dict[tuple, torch.Tensor] = {}
+        # auto = fp16/bf16 on GPU, fp32 on CPU; fp32|fp16|bf16|int8 to force
+        self._embedding_precision = os.getenv("EMBEDDING_PRECISION", "auto").lower()
+        self._resolved_paths: Dict[str, str] = self._read_resolved_paths()
+        # Opt-in: torch.compile the embedding transformer (first call pays compile cost)
+        self._compile_embedding = os.getenv("EVA_COMPILE_EMBED") == "1"
+        self._memory_stats: Optional[Dict[str, Any]] = None
+        self._memory_stats_at = 0.0
+        self._memory_stats_ttl = 0.5
+        self._last_alloc_retries: Optional[int] = None
+        # CPU only: >1 spreads bulk embedding over a multi-process encode pool
+        self._embed_workers = int(os.getenv("EVA_EMBED_WORKERS", "1"))
+        self._embed_pools: Dict[str, Dict[str, Any]] = {}
+        if self._device == "cpu" and self._embed_workers > 1:
+            atexit.register(self._stop_embed_pools)
+        logger.info(f"ModelManager initialized on device: {self._device}")
     
     async def get_embedding_model(self, model_name: str = "all-mpnet-base-v2") -> SentenceTransformer:
         """Get cached embedding model (loads once, reuses forever)"""
-        if model_name in self._models:
-            logger.debug(f"Using cached embedding model: {model_name}")
-            return self._models[model_name]
-        
-        # Prevent multiple simultaneous loads of the same model
-        if model_name not in self._loading_locks:
-            self._loading_locks[model_name] = asyncio.Lock()
-        
-        async with self._loading_locks[model_name]:
-            # Double-check after acquiring lock
-            if model_name in self._models:
-                return self._models[model_name]
-            
-            logger.info(f"Loading embedding model: {model_name}")
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+        
+        return await self._load_once(model_name, lambda: self._load_embedding_model(model_name))
+    
+    async def embed(
+        self, text: Union[str, List[str]], model_name: str = "all-mpnet-base-v2"
+    ) -> Union[List[float], List[List[float]]]:
+        """The embedding entry point: one text or a list; concurrent calls share batched encodes"""
+        if not isinstance(text, str):
+            return await self.embed_batch(text, model_name)
+        batcher = self._embedding_batchers.get(model_name)
+        if batcher is None:
+            batcher = self._embedding_batchers[model_name] = _EmbeddingBatcher(self, model_name)
+        return await batcher.submit(text)
+    
+    async def embed_batch(self, texts: List[str], model_name: str = "all-mpnet-base-v2") -> List[List[float]]:
+        """Embed many texts; uses the CPU multi-process pool when one is running"""
+        if not texts:
+            return []
+        model = await self.get_embedding_model(model_name)
+        pool = self._embed_pools.get(model_name)
+        if pool is not None and len(texts) > 1:
+            embeddings = await asyncio.to_thread(model.encode_multi_process, texts, pool)
+            return embeddings.tolist()
+        return list(await asyncio.gather(*(self.embed(text, model_name) for text in texts)))
+    
+    async def get_whisper_model(self, model_size: str = "small"):
+        """Get cached Whisper model for voice processing"""
+        model_key = f"whisper_{model_size}"
+        
+        model = self._models.get(model_key)
+        if model is not None:
+            return model
+        
+        return await self._load_once(model_key, lambda: self._load_whisper_model(model_size))
+    
+    def run_inference(self, stream_name: str, fn, *args, **kwargs):
+        """Run a forward pass on the pinned device and the model family's CUDA stream
+        
+        Called from worker threads, where the current CUDA device and grad mode
+        are not inherited, so both are pinned here as well.
+        """
+        stream = self._streams.get(stream_name)
+        if stream is None:
+            with torch.inference_mode():
+                return fn(*args, **kwargs)
+        
+        with torch.inference_mode(), torch.cuda.device(self._cuda_index), torch.cuda.stream(stream):
+            result = fn(*args, **kwargs)
+        stream.synchronize()
+        return result
+    
+    def encode_texts(self, model: SentenceTransformer, texts: List[str], slot: int = 0, max_batch: int = 32):
+        """Encode a batch; on GPU, stage tokens in pinned memory and copy asynchronously
+        
+        Runs in a worker thread. The copy goes on its own stream and the
+        forward pass waits on it, and each buffer slot is reused only after
+        its batch's result has been read back.
+        """
+        if "embedding" not in self._streams:
+            with torch.inference_mode():
+                return model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+        
+        features = model.tokenize(texts)
+        copy_stream = self._streams["embedding_copy"]
+        compute_stream = self._streams["embedding"]
+        
+        with torch.cuda.device(self._cuda_index):
+            with torch.cuda.stream(copy_stream):
+                device_features = {}
+                for name, tensor in features.items():
+                    device_features[name] = self._stage(slot, name, tensor, max_batch, model.max_seq_length or 512).to(
+                        self._torch_device, non_blocking=True
+                    )
             
-            # Try local paths first, then download
-            local_paths = [
-                './data/models/embeddings',
-                'data/models/embeddings', 
-                '/app/models/embeddings'
-            ]
+            compute_stream.wait_stream(copy_stream)
+            with torch.inference_mode(), torch.cuda.stream(compute_stream):
+                embeddings = model(device_features)["sentence_embedding"]
+                # .cpu() waits for the compute stream before the slot is released
+                return embeddings.float().cpu().numpy()
+    
+    def _stage(self, slot: int, name: str, tensor: torch.Tensor, max_batch: int, max_seq: int) -> torch.Tensor:
+        """Copy a CPU tensor into its pinned staging buffer (allocated once per slot)"""
+        if tensor.dim() != 2 or tensor.shape[0] > max_batch or tensor.shape[1] > max_seq:
+            return tensor.pin_memory()
+        
+        key = (slot, name)
+        buffer = self._staging.get(key)
+        if buffer is None or buffer.dtype != tensor.dtype:
+            buffer = self._staging[key] = torch.empty(
+                (max_batch, max_seq), dtype=tensor.dtype, pin_memory=True
+            )
+        
+        # A flat prefix of the buffer stays contiguous (and pinned); a [:rows, :cols]
+        # slice would be strided and force a pageable copy before the H2D transfer
+        rows, cols = tensor.shape
+        staged = buffer.view(-1)[:rows * cols].view(rows, cols)
+        staged.copy_(tensor)
+        return staged
+    
+    async def _load_once(self, model_key: str, loader):
+        """Load a model exactly once; concurrent callers wait on the loader's event"""
+        async with self._events_lock:
+            if model_key in self._models:
+                return self._models[model_key]
+        
+        # Model is streaming in on the background warm-up thread
+        warming = self._warming.get(model_key)
+        if warming is not None:
+            await asyncio.to_thread(warming.wait)
+        
+        async with self._events_lock:
+            if model_key in self._models:
+                return self._models[model_key]
             
-            model = None
+            event = self._loading_events.get(model_key)
+            is_loader = event is None
+            if is_loader:
+                event = self._loading_events[model_key] = asyncio.Event()
+        
+        if not is_loader:
+            await event.wait()
+            if model_key in self._models:
+                return self._models[model_key]
+            raise RuntimeError(f"Model failed to load: {model_key}")
+        
+        try:
+            # Off the event loop, so independent loads can overlap
+            model = await asyncio.to_thread(loader)
+            self._models[model_key] = model
+            return model
+        finally:
+            # Loaded or failed, release waiters; a failed key can be retried
+            self._loading_events.pop(model_key, None)
+            event.set()
+    
+    def _load_embedding_model(self, model_name: str) -> SentenceTransformer:
+        """Load embedding model from local paths, falling back to download"""
+        logger.info(f"Loading embedding model: {model_name}")
+        
+        # Try local paths first, then download
+        local_paths = [
+            './data/models/embeddings',
+            'data/models/embeddings', 
+            '/app/models/embeddings'
+        ]
+        
+        model = None
+        
+        # Path resolved on a previous start: one load, no probe
+        resolved = self._resolved_paths.get(model_name)
+        if resolved:
+            try:
+                model = SentenceTransformer(resolved, device=str(self._torch_device))
+                logger.info(f"✅ Loaded embedding model from: {resolved}")
+            except Exception as e:
+                logger.debug(f"Resolved path {resolved} failed, probing: {e}")
+        
+        if model is None:
             for path in local_paths:
                 try:
                     if os.path.exists(path):
-                        model = SentenceTransformer(path)
+                        model = SentenceTransformer(path, device=str(self._torch_device))
                         logger.info(f"✅ Loaded embedding model from: {path}")
+                        resolved = path
                         break
                 except Exception as e:
                     logger.debug(f"Failed to load from {path}: {e}")
                     continue
-            
-            # Fallback to download if local not found
-            if model is None:
-                try:
-                    model = SentenceTransformer(model_name)
-                    logger.info(f"✅ Downloaded embedding model: {model_name}")
-                except Exception as e:
-                    logger.error(f"Failed to load embedding model: {e}")
-                    raise
-            
-            # Cache the model
-            self._models[model_name] = model
-            logger.info(f"🎯 Embedding model cached successfully: {model_name}")
-            
-            return model
-    
-    async def get_whisper_model(self, model_size: str = "small"):
-        """Get cached Whisper model for voice processing"""
-        import whisper
         
-        model_key = f"whisper_{model_size}"
+        # Fallback to download if local not found
+        if model is None:
+            try:
+                model = SentenceTransformer(model_name, device=str(self._torch_device))
+                logger.info(f"✅ Downloaded embedding model: {model_name}")
+                resolved = model_name
+            except Exception as e:
+                logger.error(f"Failed to load embedding model: {e}")
+                raise
         
-        if model_key in self._models:
-            logger.debug(f"Using cached Whisper model: {model_size}")
-            return self._models[model_key]
+        if self._resolved_paths.get(model_name) != resolved:
+            self._write_resolved_path(model_name, resolved)
         
-        if model_key not in self._loading_locks:
-            self._loading_locks[model_key] = asyncio.Lock()
+        model = self._apply_embedding_precision(model)
         
-        async with self._loading_locks[model_key]:
-            if model_key in self._models:
-                return self._models[model_key]
-            
-            logger.info(f"Loading Whisper model: {model_size}")
-            
+        if self._compile_embedding and self._embedding_precision != "int8":
+            eager = model[0].auto_model
             try:
-                model = whisper.load_model(model_size)
-                self._models[model_key] = model
-                logger.info(f"✅ Whisper model cached: {model_size}")
-                return model
+                # No CUDA graphs: the batcher's two staging slots run encodes from two
+                # threads at once, and graph replays share static output buffers
+                model[0].auto_model = torch.compile(eager, mode="max-autotune-no-cudagraphs", dynamic=True)
+                # Trigger compilation now, not on the first user request
+                self.encode_texts(model, ["warm up"])
+                logger.info("⚡ Embedding model compiled with torch.compile")
             except Exception as e:
-                logger.error(f"Failed to load Whisper model: {e}")
-                raise
+                model[0].auto_model = eager
+                logger.warning(f"torch.compile failed, using eager embedding model: {e}")
+        
+        if self._device == "cpu" and self._embed_workers > 1:
+            try:
+                self._embed_pools[model_name] = model.start_multi_process_pool(
+                    target_devices=["cpu"] * self._embed_workers
+                )
+                logger.info(f"⚡ Embedding pool started with {self._embed_workers} CPU workers")
+            except Exception as e:
+                logger.warning(f"Could not start embedding pool, using single process: {e}")
+        
+        logger.info(f"🎯 Embedding model cached successfully: {model_name}")
+        return model
+    
+    @staticmethod
+    def _read_resolved_paths() -> Dict[str, str]:
+        """Read the resolved-path marker, if any"""
+        try:
+            with open(_RESOLVED_MARKER) as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    
+    def _write_resolved_path(self, model_name: str, path: str):
+        """Record the path a model loaded from for the next cold start"""
+        self._resolved_paths[model_name] = path
+        try:
+            os.makedirs(os.path.dirname(_RESOLVED_MARKER), exist_ok=True)
+            with open(_RESOLVED_MARKER, "w") as f:
+                json.dump(self._resolved_paths, f)
+        except Exception as e:
+            logger.debug(f"Could not write resolved model marker: {e}")
+    
+    def _apply_embedding_precision(self, model: SentenceTransformer) -> SentenceTransformer:
+        """Move embedding model to the device and cast to the configured precision"""
+        precision = self._embedding_precision
+        model = model.to(self._torch_device)
+        
+        if self._device == "cuda":
+            if precision == "auto":
+                precision = "bf16" if torch.cuda.is_bf16_supported() else "fp16"
+            elif precision == "int8":
+                # quantize_dynamic only has CPU kernels; half precision is the GPU equivalent
+                logger.warning("int8 embedding precision is CPU-only, using fp16 on GPU")
+                precision = "fp16"
+            if precision == "bf16":
+                model = model.to(torch.bfloat16)
+            elif precision == "fp16":
+                model = model.half()
+            else:
+                precision = "fp32"
+        elif precision == "int8":
+            # Dynamic int8 quantization of Linear layers (FBGEMM GEMMs on CPU)
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        else:
+            precision = "fp32"
+        
+        logger.info(f"Embedding model precision: {precision} on {self._torch_device}")
+        return model
+    
+    def _load_whisper_model(self, model_size: str):
+        """Load Whisper model (faster-whisper when installed)"""
+        logger.info(f"Loading Whisper model: {model_size}")
+        
+        try:
+            if FASTER_WHISPER_AVAILABLE:
+                model = _FasterWhisperAdapter(WhisperModel(
+                    model_size,
+                    device=self._device,
+                    device_index=self._cuda_index or 0,
+                    compute_type="int8_float16" if self._device == "cuda" else "int8"
+                ))
+                logger.info(f"✅ faster-whisper model cached: {model_size}")
+                return model
+            
+            import whisper
+            model = whisper.load_model(model_size, device=self._torch_device)
+            logger.info(f"✅ Whisper model cached: {model_size}")
+            return model
+        except Exception as e:
+            logger.error(f"Failed to load Whisper model: {e}")
+            raise
+    
+    def after_inference(self):
+        """Count an inference call; release cached GPU blocks every N calls"""
+        self._ops_since_empty += 1
+        if self._ops_since_empty >= self._empty_cache_every:
+            self._ops_since_empty = 0
+            if self._device == "cuda":
+                torch.cuda.empty_cache()
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about loaded models"""
@@ -114,45 +462,140 @@ class ModelManager:
             "loaded_models": list(self._models.keys()),
             "device": self._device,
             "gpu_available": torch.cuda.is_available(),
-            "memory_usage": self._get_memory_usage()
+            "memory_usage": self._get_memory_usage(),
+            "allocator_stats": self._get_allocator_stats()
+        }
+    
+    def _get_allocator_stats(self) -> Dict[str, int]:
+        """CUDA caching-allocator counters that signal fragmentation"""
+        stats = self._memory_snapshot()
+        if not stats:
+            return {}
+        return {
+            "num_alloc_retries": stats.get("num_alloc_retries", 0),
+            "num_ooms": stats.get("num_ooms", 0)
         }
     
     def _get_memory_usage(self) -> Dict[str, str]:
         """Get current memory usage"""
         try:
             if torch.cuda.is_available():
+                stats = self._memory_snapshot()
                 return {
-                    "gpu_allocated": f"{torch.cuda.memory_allocated() / 1024**3:.2f} GB",
-                    "gpu_cached": f"{torch.cuda.memory_reserved() / 1024**3:.2f} GB"
+                    "gpu_allocated": f"{stats.get('allocated_bytes.all.current', 0) / 1024**3:.2f} GB",
+                    "gpu_cached": f"{stats.get('reserved_bytes.all.current', 0) / 1024**3:.2f} GB"
                 }
             else:
                 return {"cpu_only": "No GPU available"}
         except Exception:
             return {"error": "Could not retrieve memory info"}
     
+    def _memory_snapshot(self) -> Dict[str, Any]:
+        """One memory_stats() call, cached briefly; releases cache when the allocator starts retrying"""
+        if not torch.cuda.is_available():
+            return {}
+        now = time.monotonic()
+        if self._memory_stats is not None and now - self._memory_stats_at < self._memory_stats_ttl:
+            return self._memory_stats
+        try:
+            stats = torch.cuda.memory_stats()
+        except Exception:
+            return {}
+        retries = stats.get("num_alloc_retries", 0)
+        if self._last_alloc_retries is not None and retries > self._last_alloc_retries:
+            logger.warning(f"⚠️ CUDA allocator retried {retries - self._last_alloc_retries} times, releasing cached blocks")
+            torch.cuda.empty_cache()
+        self._last_alloc_retries = retries
+        self._memory_stats = stats
+        self._memory_stats_at = now
+        return stats
+    
+    async def warm_up(self):
+        """Startup warm-up, called by the entrypoints once the environment is loaded
+        
+        EVA_EAGER_WARMUP=1 loads weights on a background thread and returns
+        immediately; otherwise startup waits for the models.
+        """
+        if os.getenv("EVA_EAGER_WARMUP") == "1":
+            self.start_background_warmup()
+        else:
+            await self.warm_up_models()
+    
+    def start_background_warmup(self):
+        """Warm models on a daemon thread so the server accepts requests meanwhile"""
+        if self.background_warmup:
+            return
+        
+        # Same keys the services request, so the first request hits the warm model
+        embedding_model = config.ai.embedding_model
+        whisper_size = config.voice.whisper_model_size
+        jobs = [
+            (embedding_model, lambda: self._load_embedding_model(embedding_model)),
+            (f"whisper_{whisper_size}", lambda: self._load_whisper_model(whisper_size))
+        ]
+        for model_key, _ in jobs:
+            self._warming[model_key] = threading.Event()
+        self.background_warmup = True
+        
+        def run():
+            logger.info("🔥 Warming up models in background...")
+            for model_key, loader in jobs:
+                try:
+                    if model_key not in self._models:
+                        self._models[model_key] = loader()
+                except Exception as e:
+                    logger.error(f"Background warm-up failed for {model_key}: {e}")
+                finally:
+                    self._warming.pop(model_key).set()
+            self.ready.set()
+            logger.info("🎯 Background model warm-up completed!")
+        
+        threading.Thread(target=run, name="model-warmup", daemon=True).start()
+    
     async def warm_up_models(self):
         """Pre-load frequently used models for faster startup"""
+        if self.background_warmup:
+            return  # Already loading on the warm-up thread
+        
         logger.info("🔥 Warming up models...")
         
         try:
-            # Load embedding model
-            await self.get_embedding_model()
-            
-            # Load Whisper if voice is enabled
-            whisper_size = os.getenv("WHISPER_MODEL_SIZE", "small")
-            await self.get_whisper_model(whisper_size)
+            # Load embedding + Whisper models concurrently
+            results = await asyncio.gather(
+                self.get_embedding_model(config.ai.embedding_model),
+                self.get_whisper_model(config.voice.whisper_model_size),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
             
             logger.info("🎯 Model warm-up completed!")
         except Exception as e:
             logger.error(f"Model warm-up failed: {e}")
+        finally:
+            self.ready.set()
+    
+    def _stop_embed_pools(self):
+        """Terminate multi-process embedding workers"""
+        for model_name, pool in list(self._embed_pools.items()):
+            try:
+                SentenceTransformer.stop_multi_process_pool(pool)
+            except Exception as e:
+                logger.debug(f"Failed to stop embedding pool for {model_name}: {e}")
+        self._embed_pools.clear()
     
     def clear_cache(self):
         """Clear all cached models (for debugging/memory management)"""
         logger.info("Clearing model cache...")
+        for batcher in self._embedding_batchers.values():
+            batcher.close()
+        self._embedding_batchers.clear()
+        self._stop_embed_pools()
         self._models.clear()
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
         logger.info("Model cache cleared")
 
 # Singleton instance
-model_manager = ModelManager()
\ No newline at end of file
+model_manager = ModelManager()
@@ -4,7 +4,11 @@ Handles complex reasoning tasks, context analysis, and decision making per PRD
 """
 
 import asyncio
+import functools
 import logging
+import re
+import threading
+from collections import Counter, OrderedDict
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from .model_manager import model_manager
@@ -13,6 +17,50 @@ from .memory_service import memory_service
 
 logger = logging.getLogger(__name__)
 
+# Optional Aho-Corasick automaton: one pass per text for every keyword set
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Keyword sets by category (substring match, each keyword counted once per text)
+_KEYWORD_CATEGORIES = {
+    # Reasoning types (dict order is the tie-break order)
+    "analytical": ("analyze", "explain", "why", "how", "because", "reason"),
+    "creative": ("create", "imagine", "design", "brainstorm", "innovative"),
+    "logical": ("if", "then", "therefore", "conclude", "prove", "logic"),
+    "critical": ("evaluate", "judge", "critique", "assess", "compare"),
+    # Sentiment
+    "positive": ("good", "great", "excellent", "amazing", "wonderful", "happy", "love"),
+    "negative": ("bad", "terrible", "awful", "hate", "sad", "angry", "frustrated"),
+    # Topics
+    "technology": ("ai", "computer", "software", "code", "programming"),
+    "personal": ("i", "me", "my", "personal", "life"),
+    "help": ("help", "how", "question", "problem", "issue"),
+    "learning": ("learn", "study", "understand", "explain", "teach")
+}
+# Entity extraction patterns
+_PROPER_NOUN_RE = re.compile(r'\b[A-Z][a-z]+\b')
+_CAMEL_CASE_RE = re.compile(r'\b[a-z]+(?:[A-Z][a-z]*)+\b')
+
+# Complexity signals: question marks + technical terms in one scan
+_COMPLEXITY_RE = re.compile(r'\?|api|database|algorithm|function|class|method')
+
+_REASONING_CATEGORIES = ("analytical", "creative", "logical", "critical")
+_TOPIC_CATEGORIES = ("technology", "personal", "help", "learning")
+
+# Messages shorter than this with no capitals cannot yield entities
+_SHORT_MESSAGE_LEN = 8
+
+# Result for an empty message with no history: nothing to search or analyze
+_EMPTY_ANALYSIS = {
+    "conversation_flow": {"pattern": "new_conversation", "sentiment": "neutral"},
+    "reasoning_type": "analytical",
+    "complexity_score": 0.0,
+    "confidence": 0.5
+}
+
 class ReasoningService:
     """Dedicated reasoning layer with advanced cognitive capabilities"""
     
@@ -26,13 +74,34 @@ class ReasoningService:
             "critical": "Evaluate arguments and evidence objectively"
         }
         
+        # Multi-turn contexts mostly repeat: memoize the flow per (user, window)
+        # and sentiment per message so a new turn only scores the new message
+        self._flow_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._flow_cache_size = 1024
+        self._flow_cache_lock = threading.Lock()  # analyses run in worker threads
+        self._cached_sentiment = functools.lru_cache(maxsize=4096)(self._analyze_sentiment)
+        
+        # keyword -> categories it belongs to, compiled once into a DFA
+        self._keyword_automaton = None
+        if AHOCORASICK_AVAILABLE:
+            keyword_map: Dict[str, List[str]] = {}
+            for category, keywords in _KEYWORD_CATEGORIES.items():
+                for keyword in keywords:
+                    keyword_map.setdefault(keyword, []).append(category)
+            
+            self._keyword_automaton = ahocorasick.Automaton()
+            for keyword, categories in keyword_map.items():
+                self._keyword_automaton.add_word(keyword, (keyword, tuple(categories)))
+            self._keyword_automaton.make_automaton()
+        
     async def initialize(self):
         """Initialize reasoning service"""
         if self._initialized:
             return
             
-        # Ensure dependencies are initialized
-        await model_manager.warm_up_models()
+        # Ensure dependencies are initialized (eager warm-up already runs in background)
+        if not model_manager.background_warmup:
+            await model_manager.warm_up_models()
         await memory_service.initialize()
         
         self._initialized = True
@@ -48,34 +117,45 @@ class ReasoningService:
         
         if not self._initialized:
             await self.initialize()
+        
+        if not context and (not message or message.isspace()):
+            return {
+                **_EMPTY_ANALYSIS,
+                "memories": [],
+                "conversation_flow": dict(_EMPTY_ANALYSIS["conversation_flow"]),
+                "entities": []
+            }
+        
+        # Give background warm-up a short head start, then proceed regardless
+        if not model_manager.ready.is_set():
+            await asyncio.to_thread(model_manager.ready.wait, 2.0)
             
+        # Extract relevant memories (I/O-bound) while the local analyses run
+        memories_task = asyncio.create_task(memory_service.search_memories(
+            query=message,
+            user_id=user_id,
+            limit=5
+        ))
+        
         try:
-            # Extract relevant memories
-            memories = await memory_service.search_memories(
-                query=message,
-                user_id=user_id,
-                limit=5
+            # CPU-bound analyses in one worker-thread hop, off the event loop
+            context_analysis, reasoning_type, entities, complexity = await asyncio.to_thread(
+                self._analyze_local, message, context, user_id
             )
             
-            # Analyze conversation flow
-            context_analysis = await self._analyze_conversation_flow(context)
-            
-            # Determine reasoning type needed
-            reasoning_type = await self._determine_reasoning_type(message, context)
-            
-            # Extract key concepts and entities
-            entities = await self._extract_entities(message, context)
+            memories = await memories_task
             
             return {
                 "memories": memories,
                 "conversation_flow": context_analysis,
                 "reasoning_type": reasoning_type,
                 "entities": entities,
-                "complexity_score": self._calculate_complexity(message, context),
+                "complexity_score": complexity,
                 "confidence": self._calculate_confidence(context, memories)
             }
             
         except Exception as e:
+            memories_task.cancel()
             logger.error(f"Context analysis failed: {e}")
             return {"error": str(e)}
     
@@ -120,7 +200,18 @@ class ReasoningService:
                 "fallback_response": "I apologize, but I'm having trouble processing that right now."
             }
     
-    async def _analyze_conversation_flow(self, context: List[Dict]) -> Dict[str, Any]:
+    def _analyze_local(
+        self, message: str, context: List[Dict], user_id: str
+    ) -> Tuple[Dict[str, Any], str, List[str], float]:
+        """Run the pure-Python analyses (flow, reasoning type, entities, complexity)"""
+        return (
+            self._analyze_conversation_flow(context, user_id),
+            self._determine_reasoning_type(message, context),
+            self._extract_entities(message, context),
+            self._calculate_complexity(message, context)
+        )
+    
+    def _analyze_conversation_flow(self, context: List[Dict], user_id: str = "") -> Dict[str, Any]:
         """Analyze conversation patterns and flow"""
         
         if not context:
@@ -130,12 +221,31 @@ class ReasoningService:
             # Analyze recent messages for patterns
             recent_messages = context[-5:] if len(context) > 5 else context
             
-            # Extract sentiment progression
-            sentiment_flow = []
-            for msg in recent_messages:
-                content = msg.get("content", "")
-                sentiment = self._analyze_sentiment(content)
-                sentiment_flow.append(sentiment)
+            # Redis-cached context items carry an id; ChromaDB fallback items only
+            # metadata, so their write timestamp identifies them instead
+            cache_key = (
+                user_id,
+                len(context),
+                tuple(
+                    msg.get("id") or msg.get("metadata", {}).get("timestamp_ns") or msg.get("text", "")
+                    for msg in recent_messages
+                )
+            )
+            with self._flow_cache_lock:
+                cached = self._flow_cache.get(cache_key)
+                if cached is not None:
+                    self._flow_cache.move_to_end(cache_key)
+            if cached is not None:
+                return {
+                    **cached,
+                    "sentiment_flow": list(cached["sentiment_flow"]),
+                    "recent_topics": list(cached["recent_topics"])
+                }
+            
+            # Extract sentiment progression (per-message memoized)
+            sentiment_flow = [
+                self._cached_sentiment(msg.get("text", "")) for msg in recent_messages
+            ]
             
             # Detect conversation patterns
             pattern = self._detect_pattern(recent_messages)
@@ -143,7 +253,7 @@ class ReasoningService:
             # Calculate engagement level
             engagement = self._calculate_engagement(recent_messages)
             
-            return {
+            result = {
                 "pattern": pattern,
                 "sentiment_flow": sentiment_flow,
                 "current_sentiment": sentiment_flow[-1] if sentiment_flow else "neutral",
@@ -152,64 +262,68 @@ class ReasoningService:
                 "recent_topics": self._extract_topics(recent_messages)
             }
             
+            with self._flow_cache_lock:
+                self._flow_cache[cache_key] = result
+                while len(self._flow_cache) > self._flow_cache_size:
+                    self._flow_cache.popitem(last=False)
+            
+            return {
+                **result,
+                "sentiment_flow": list(sentiment_flow),
+                "recent_topics": list(result["recent_topics"])
+            }
+            
         except Exception as e:
             logger.error(f"Conversation flow analysis failed: {e}")
             return {"pattern": "unknown", "sentiment": "neutral"}
     
-    async def _determine_reasoning_type(self, message: str, context: List[Dict]) -> str:
+    def _determine_reasoning_type(self, message: str, context: List[Dict]) -> str:
         """Determine the type of reasoning needed"""
         
-        # Keywords that indicate different reasoning types
-        analytical_keywords = ["analyze", "explain", "why", "how", "because", "reason"]
-        creative_keywords = ["create", "imagine", "design", "brainstorm", "innovative"]
-        logical_keywords = ["if", "then", "therefore", "conclude", "prove", "logic"]
-        critical_keywords = ["evaluate", "judge", "critique", "assess", "compare"]
+        if not message or message.isspace():
+            return "analytical"
         
-        message_lower = message.lower()
-        
-        # Count keyword matches
-        scores = {
-            "analytical": sum(1 for kw in analytical_keywords if kw in message_lower),
-            "creative": sum(1 for kw in creative_keywords if kw in message_lower),
-            "logical": sum(1 for kw in logical_keywords if kw in message_lower),
-            "critical": sum(1 for kw in critical_keywords if kw in message_lower)
-        }
+        # Count keyword matches per reasoning type
+        counts = self._match_keywords(message.lower())
+        scores = {category: counts[category] for category in _REASONING_CATEGORIES}
         
         # Return type with highest score, default to analytical
         return max(scores, key=scores.get) if max(scores.values()) > 0 else "analytical"
     
-    async def _extract_entities(self, message: str, context: List[Dict]) -> List[str]:
+    def _extract_entities(self, message: str, context: List[Dict]) -> List[str]:
         """Extract key entities and concepts from message and context"""
         
-        # Simple entity extraction (could be enhanced with NLP models)
-        import re
+        # Both patterns need an uppercase letter; skip trivial replies ("ok", "yes")
+        if not message or message.isspace() or (len(message) < _SHORT_MESSAGE_LEN and message.islower()):
+            return []
         
-        entities = []
+        # Simple entity extraction (could be enhanced with NLP models):
+        # capitalized words (likely proper nouns) + camelCase technical terms
+        entities = set(_PROPER_NOUN_RE.findall(message))
+        entities.update(_CAMEL_CASE_RE.findall(message))
         
-        # Extract capitalized words (likely proper nouns)
-        proper_nouns = re.findall(r'\b[A-Z][a-z]+\b', message)
-        entities.extend(proper_nouns)
-        
-        # Extract technical terms and concepts
-        technical_terms = re.findall(r'\b[a-z]+(?:[A-Z][a-z]*)+\b', message)  # camelCase
-        entities.extend(technical_terms)
-        
-        return list(set(entities))  # Remove duplicates
+        return list(entities)  # Remove duplicates
     
     def _calculate_complexity(self, message: str, context: List[Dict]) -> float:
         """Calculate complexity score for the reasoning task"""
         
         complexity_score = 0.0
         
+        if not message or message.isspace():
+            return min(len(message) / 500, 0.3) + min(len(context) * 0.05, 0.3)
+        
+        # One scan for question marks and (distinct) technical terms
+        matches = Counter(_COMPLEXITY_RE.findall(message.lower()))
+        question_count = matches.pop('?', 0)
+        
         # Length contributes to complexity
         complexity_score += min(len(message) / 500, 0.3)
         
         # Question marks indicate inquiry complexity
-        complexity_score += min(message.count('?') * 0.1, 0.2)
+        complexity_score += min(question_count * 0.1, 0.2)
         
         # Technical terms increase complexity
-        technical_indicators = ['api', 'database', 'algorithm', 'function', 'class', 'method']
-        complexity_score += min(sum(0.1 for term in technical_indicators if term in message.lower()), 0.2)
+        complexity_score += min(0.1 * len(matches), 0.2)
         
         # Context length affects complexity
         complexity_score += min(len(context) * 0.05, 0.3)
@@ -292,12 +406,9 @@ Please provide a clear, structured response that addresses the query methodicall
     def _analyze_sentiment(self, text: str) -> str:
         """Simple sentiment analysis"""
         
-        positive_words = ["good", "great", "excellent", "amazing", "wonderful", "happy", "love"]
-        negative_words = ["bad", "terrible", "awful", "hate", "sad", "angry", "frustrated"]
-        
-        text_lower = text.lower()
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
+        counts = self._match_keywords(text.lower())
+        positive_count = counts["positive"]
+        negative_count = counts["negative"]
         
         if positive_count > negative_count:
             return "positive"
@@ -313,7 +424,7 @@ Please provide a clear, structured response that addresses the query methodicall
             return "new_conversation"
             
         # Simple pattern detection based on message characteristics
-        question_count = sum(1 for msg in messages if '?' in msg.get("content", ""))
+        question_count = sum(1 for msg in messages if '?' in msg.get("text", ""))
         
         if question_count > len(messages) * 0.7:
             return "inquiry_heavy"
@@ -329,7 +440,7 @@ Please provide a clear, structured response that addresses the query methodicall
             return 0.5
             
         # Calculate based on message length and frequency
-        avg_length = sum(len(msg.get("content", "")) for msg in messages) / len(messages)
+        avg_length = sum(len(msg.get("text", "")) for msg in messages) / len(messages)
         engagement = min(avg_length / 100, 1.0)  # Normalize to 0-1
         
         return engagement
@@ -338,22 +449,28 @@ Please provide a clear, structured response that addresses the query methodicall
         """Extract main topics from recent messages"""
         
         # Simple topic extraction (could be enhanced with NLP)
-        all_text = " ".join(msg.get("content", "") for msg in messages)
-        
-        # Common topic keywords
-        topic_keywords = {
-            "technology": ["ai", "computer", "software", "code", "programming"],
-            "personal": ["i", "me", "my", "personal", "life"],
-            "help": ["help", "how", "question", "problem", "issue"],
-            "learning": ["learn", "study", "understand", "explain", "teach"]
-        }
+        all_text = " ".join(msg.get("text", "") for msg in messages)
+        if not all_text or all_text.isspace():
+            return []
         
-        topics = []
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in all_text.lower() for keyword in keywords):
-                topics.append(topic)
-        
-        return topics
+        counts = self._match_keywords(all_text.lower())
+        return [topic for topic in _TOPIC_CATEGORIES if counts[topic]]
+    
+    def _match_keywords(self, text_lower: str) -> Counter:
+        """Count distinct keyword hits per category in a single pass over the text"""
+        counts = Counter()
+        
+        if self._keyword_automaton is not None:
+            seen = set()
+            for _, (keyword, categories) in self._keyword_automaton.iter(text_lower):
+                if keyword not in seen:
+                    seen.add(keyword)
+                    counts.update(categories)
+            return counts
+        
+        for category, keywords in _KEYWORD_CATEGORIES.items():
+            counts[category] = sum(1 for kw in keywords if kw in text_lower)
+        return counts
 
 # Global instance
 reasoning_service = ReasoningService()
\ No newline at end of file
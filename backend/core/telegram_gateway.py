@@ -3,29 +3,235 @@ TelegramGateway - Clean Telegram bot integration
 Routes messages through our clean architecture services
 """
 import asyncio
-import os
+import io
+import re
 import logging
-import tempfile
+import time
+from collections import deque
 from typing import Dict, Any, Optional
-from datetime import datetime
-from telegram import Update, InlineQueryResultArticle, InputTextMessageContent
+from telegram import Update, Message, InlineQueryResultArticle, InputTextMessageContent
 from telegram.ext import (
     Application, CommandHandler, MessageHandler, 
     InlineQueryHandler, filters, ContextTypes
 )
-from telegram.constants import ParseMode
+from telegram.constants import ChatType, ParseMode
+from telegram.error import BadRequest
 from uuid import uuid4
+from cachetools import TTLCache
+import numpy as np
+import redis.asyncio as aioredis
 
 from .config_manager import config
 from .ai_service import ai_service
 from .memory_service import memory_service
+from .lora_service import lora_service
 from .voice_service import voice_service
 
-# Import web search capability
-import httpx
-
 logger = logging.getLogger(__name__)
 
+# Optional token-bucket limiter for outbound Telegram messages
+try:
+    from aiolimiter import AsyncLimiter
+    AIOLIMITER_AVAILABLE = True
+except ImportError:
+    AIOLIMITER_AVAILABLE = False
+
+# Telegram's hard limit for one text message
+_MAX_MESSAGE_LENGTH = 4096
+
+_DELIVERY_FAILED_TEXT = "Sorry, I couldn't send my reply. Please try again."
+
+def _head(text: str, n: int = 200) -> str:
+    """First n characters, with an ellipsis only when something was cut"""
+    return text if len(text) <= n else text[:n].rstrip() + "…"
+
+_MD = ParseMode.MARKDOWN
+
+# Atomic token bucket shared by all workers: refill, spend, write back in one step.
+# KEYS[1] = bucket hash; ARGV = capacity, refill tokens/ms, now (ms)
+_RATE_LIMIT_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+return allowed
+"""
+
+# Rate-limited actions: action -> (capacity, refill tokens/sec)
+_RATE_LIMITS = {
+    "message": (3, 1 / 30),
+    "ask": (3, 1 / 15),
+    "voice": (3, 1 / 60)
+}
+
+_TONE_TTL = 86400  # Seconds a tone choice is remembered
+
+# Semantic response cache: a near-duplicate question (same user, same tone)
+# reuses the earlier answer instead of another LLM call
+_RESPONSE_CACHE_THRESHOLD = 0.92  # cosine similarity
+_RESPONSE_CACHE_PER_USER = 32
+_RESPONSE_CACHE_MIN_LENGTH = 12  # shorter turns ("yes", "why?") depend on context
+
+# Inline queries arrive on every keystroke; answers are reused for as long as
+# Telegram's own cache_time and partial queries below the minimum are ignored
+_INLINE_CACHE_TTL = 60
+_INLINE_MIN_QUERY_LENGTH = 3
+_VOLATILE_RE = re.compile(
+    r"\b(today|tonight|now|latest|current|news|yesterday|tomorrow|weather|price)\b",
+    re.IGNORECASE
+)
+
+# Update types the registered handlers consume
+_ALLOWED_UPDATES = ["message", "inline_query", "callback_query"]
+
+# /tone: available tones and their confirmations
+_TONES = ("friendly", "formal", "gen-z")
+_TONE_RESPONSES = {
+    "friendly": "Great! I'm now in friendly mode. Let's have a nice chat! 😊",
+    "formal": "Understood. I have switched to formal communication mode.",
+    "gen-z": "bet! switched to gen-z mode, this bout to be fire 🔥✨"
+}
+_TONE_CHOICES = f"Please choose from: {', '.join(_TONES)}"
+_TONE_STATUS_TEMPLATE = (
+    "Current tone: **{current_tone}**\n\n"
+    "Available tones:\n"
+    "• `friendly` - Warm and casual\n"
+    "• `formal` - Professional and precise\n"
+    "• `gen-z` - Fun and trendy\n\n"
+    "Usage: `/tone friendly`"
+)
+
+# /web: keyword -> category routing in one compiled pattern. Each branch is a
+# lookahead anchored at the start, so categories keep their priority order
+# (news > tech > india) no matter where in the query the keyword appears
+_SEARCH_ROUTER = re.compile(
+    r"^(?:"
+    r"(?=.*?(?:news|latest|today|current))(?P<news>)"
+    r"|(?=.*?(?:technology|ai|programming|code))(?P<tech>)"
+    r"|(?=.*?(?:india|pm|politics|government))(?P<india>)"
+    r")",
+    re.IGNORECASE | re.DOTALL
+)
+_SEARCH_RESULTS = {
+    "news": (
+        "Recent news and developments about {query}",
+        "Current events and breaking stories",
+        "Latest updates and trending topics",
+        "Real-time information and statistics"
+    ),
+    "tech": (
+        "Technical information about {query}",
+        "Development trends and best practices",
+        "Documentation and tutorials",
+        "Research papers and innovations"
+    ),
+    "india": (
+        "Current information about {query}",
+        "Government updates and policies",
+        "Political developments and news",
+        "Official announcements and statements"
+    ),
+    "general": (
+        "Comprehensive information about {query}",
+        "Educational resources and guides",
+        "Expert insights and analysis",
+        "Multiple perspectives and sources"
+    )
+}
+# Enumerated once per category; only {query} is filled in per request
+_SEARCH_TEMPLATES = {
+    category: "\n".join(f"{i + 1}. {result}" for i, result in enumerate(results))
+    for category, results in _SEARCH_RESULTS.items()
+}
+
+# /web: static analysis instructions, sent ahead of context and results so
+# the prompt prefix is identical across requests and stays cache-resident
+_WEB_ANALYSIS_INSTRUCTIONS = """Summarize and analyze the web search results in the user's message.
+
+Please provide:
+1. **Summary**: Key findings and main points
+2. **Current Status**: What's happening now
+3. **Key Insights**: Important details and trends
+4. **Implications**: What this means
+
+Make it informative and well-organized."""
+
+# Static command texts, rendered once at import
+_WELCOME_TEMPLATE = """
+🧠 **Welcome to Eva, {first_name}!**
+
+I'm your intelligent AI assistant with memory and voice capabilities.
+
+**💬 Chat Commands:**
+• `/ask <question>` - Ask me anything
+• `/recall <topic>` - Search our conversation history
+• `/tone <style>` - Change my personality (friendly/formal/gen-z)
+
+**🎵 Voice Features:**
+• Send voice messages - I'll transcribe and respond
+• I can reply with voice too!
+
+**🧠 Memory & Stats:**
+• `/stats` - View service status and usage
+• `/health` - Check system health
+• `/forget` - Clear your data (GDPR)
+
+**💡 Inline Mode:**
+Type `@{bot_username} <query>` in any chat!
+
+Ready to chat? Just send me a message! 🚀
+        """
+
+_HELP_TEXT = """
+🤖 **Eva Help**
+
+**💬 Basic Commands:**
+• `/start` - Welcome message  
+• `/help` - This help message
+• `/ask <question>` - Ask me anything
+• `/recall <topic>` - Search conversation history
+
+**🔍 Web Search & Research:**
+• `/search <query>` - Search the web for information
+• `/news <topic>` - Get latest news about a topic
+• `/web <topic>` - Intelligent web research with AI analysis
+
+**🎭 Personality & Analysis:**
+• `/tone friendly|formal|gen-z` - Change personality (VERY different!)
+• `/dream` - Generate insights from our conversations
+• `/why` - Explain my last reasoning process
+• `/analyze <topic>` - Deep analysis of any topic
+• `/summary` - Summarize our conversation history
+
+**📊 System & Data:**
+• `/stats` - Service status and usage
+• `/health` - System health check
+• `/forget` - Clear your data (GDPR)
+
+**🎵 Features:**
+• Send voice messages - I'll transcribe AND respond with voice!
+• Text conversations with persistent memory
+• Multiple distinct personality modes
+• Inline queries: `@eva_bot <question>`
+
+**🔒 Privacy:**
+• Your data is encrypted and secure
+• Use `/forget` to delete everything
+• No data shared with third parties
+
+Try different personality modes - they're now VERY different! 🎭
+        """
+
 class TelegramGateway:
     """Clean Telegram gateway using our architecture services"""
     
@@ -33,9 +239,40 @@ class TelegramGateway:
         self.app: Optional[Application] = None
         self._initialized = False
         
-        # User state management
-        self.user_tones = {}  # user_id -> tone
-        self.rate_limits = {}  # Simple in-memory rate limiting
+        # User state lives in Redis so every worker agrees; these bounded
+        # local caches are the fallback when Redis is unreachable
+        self.user_tones = TTLCache(maxsize=50_000, ttl=_TONE_TTL)  # Telegram user id (int) -> tone
+        self.rate_limits = TTLCache(maxsize=50_000, ttl=3600)  # Simple in-memory rate limiting
+        self._expire_interval = 60
+        self._expire_task: Optional[asyncio.Task] = None
+        self._background_tasks = set()  # Strong refs for fire-and-forget tasks
+        self._memory_writes: Dict[str, set] = {}  # user id -> in-flight memory write tasks
+        
+        # Cap in-flight updates so slow AI/voice handlers can't pile up unbounded
+        self._max_concurrent_updates = 256
+        self._update_slots = asyncio.Semaphore(self._max_concurrent_updates)
+        
+        # Outbound messages: one queue + drain task per chat, paced to Telegram's
+        # ~1 msg/s per chat and 30 msg/s global limits
+        self._outbound: Dict[int, deque] = {}
+        self._outbound_tasks: Dict[int, asyncio.Task] = {}
+        self._chat_limiters = TTLCache(maxsize=50_000, ttl=60)
+        self._global_limiter = AsyncLimiter(28, 1) if AIOLIMITER_AVAILABLE else None
+        self._bot_username: Optional[str] = None
+        self._commands: Dict[str, Any] = {}
+        
+        # Back-to-back commands reuse the same recent context (user_id -> {limit: context})
+        self._ctx_cache = TTLCache(maxsize=10_000, ttl=10)
+        
+        self._redis_pool = None
+        self._redis = None
+        self._rate_script = None
+        
+        # user_id -> [(tone, unit embedding, response)], newest last
+        self._response_cache = TTLCache(maxsize=10_000, ttl=3600)
+        
+        # (uid, tone, normalized query) -> inline answer
+        self._inline_cache = TTLCache(maxsize=4096, ttl=_INLINE_CACHE_TTL)
     
     async def initialize(self):
         """Initialize the Telegram gateway"""
@@ -43,22 +280,56 @@ class TelegramGateway:
             return
         
         try:
-            # Initialize services
-            await ai_service.initialize()
-            await memory_service.initialize()
-            await voice_service.initialize()
+            # Shared state (tones, rate limits) for multi-worker webhook mode
+            self._redis_pool = aioredis.ConnectionPool.from_url(
+                config.database.redis_url,
+                decode_responses=True,
+                max_connections=20,
+                retry_on_timeout=True
+            )
+            self._redis = aioredis.Redis(connection_pool=self._redis_pool)
+            self._rate_script = self._redis.register_script(_RATE_LIMIT_LUA)
+            
+            # Initialize services (independent; cold start costs the slowest, not the sum)
+            await asyncio.gather(
+                ai_service.initialize(),
+                memory_service.initialize(),
+                voice_service.initialize()
+            )
             
             # Build Telegram application
             if not config.telegram.bot_token:
                 raise ValueError("TELEGRAM_BOT_TOKEN is required")
             
-            self.app = Application.builder().token(config.telegram.bot_token).build()
+            # Updater-fed updates (polling / built-in webhook) run concurrently too.
+            # Bot API calls go over HTTP/2 so bursts of replies and file
+            # downloads multiplex on warm connections instead of new handshakes
+            builder = (
+                Application.builder()
+                .token(config.telegram.bot_token)
+                .concurrent_updates(self._max_concurrent_updates)
+                .http_version("2")
+                .pool_timeout(5.0)
+                .get_updates_http_version("2")
+            )
+            if config.telegram.local_api_url:
+                builder = (
+                    builder
+                    .base_url(f"{config.telegram.local_api_url}/bot")
+                    .base_file_url(f"{config.telegram.local_api_url}/file/bot")
+                    .local_mode(True)
+                )
+            self.app = builder.build()
             
             # Register handlers
             self._register_handlers()
             
             # Initialize application
             await self.app.initialize()
+            self._bot_username = self.app.bot.username
+            
+            # TTLCache only evicts on access; sweep so unread entries are freed too
+            self._expire_task = asyncio.create_task(self._expire_user_state())
             
             self._initialized = True
             logger.info("🎯 TelegramGateway initialized successfully")
@@ -70,26 +341,29 @@ class TelegramGateway:
     def _register_handlers(self):
         """Register all Telegram bot handlers"""
         
-        # Command handlers
-        self.app.add_handler(CommandHandler("start", self._handle_start))
-        self.app.add_handler(CommandHandler("help", self._handle_help))
-        self.app.add_handler(CommandHandler("ask", self._handle_ask))
-        self.app.add_handler(CommandHandler("recall", self._handle_recall))
-        self.app.add_handler(CommandHandler("tone", self._handle_tone))
-        self.app.add_handler(CommandHandler("stats", self._handle_stats))
-        self.app.add_handler(CommandHandler("health", self._handle_health))
-        self.app.add_handler(CommandHandler("forget", self._handle_forget))
-        
-        # Advanced commands
-        self.app.add_handler(CommandHandler("dream", self._handle_dream))
-        self.app.add_handler(CommandHandler("why", self._handle_why))
-        self.app.add_handler(CommandHandler("analyze", self._handle_analyze))
-        self.app.add_handler(CommandHandler("summary", self._handle_summary))
-        
-        # Web search commands
-        self.app.add_handler(CommandHandler("search", self._handle_search))
-        self.app.add_handler(CommandHandler("news", self._handle_news))
-        self.app.add_handler(CommandHandler("web", self._handle_web))
+        # Command table: one CommandHandler, dict dispatch on the command name
+        self._commands = {
+            "start": self._handle_start,
+            "help": self._handle_help,
+            "ask": self._handle_ask,
+            "recall": self._handle_recall,
+            "tone": self._handle_tone,
+            "stats": self._handle_stats,
+            "health": self._handle_health,
+            "forget": self._handle_forget,
+            
+            # Advanced commands
+            "dream": self._handle_dream,
+            "why": self._handle_why,
+            "analyze": self._handle_analyze,
+            "summary": self._handle_summary,
+            
+            # Web search commands
+            "search": self._handle_search,
+            "news": self._handle_news,
+            "web": self._handle_web
+        }
+        self.app.add_handler(CommandHandler(list(self._commands), self._dispatch_command))
         
         # Message handlers
         self.app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self._handle_message))
@@ -101,13 +375,25 @@ class TelegramGateway:
         
         logger.info("✅ All Telegram handlers registered")
     
+    async def start(self):
+        """Start in the configured delivery mode (webhook in production, polling in dev)"""
+        if config.telegram.is_webhook_mode:
+            await self.start_webhook()
+        else:
+            await self.start_polling()
+    
     async def start_polling(self):
-        """Start polling mode"""
+        """Start polling mode (development only)"""
         if not self._initialized:
             await self.initialize()
         
         await self.app.start()
-        await self.app.updater.start_polling()
+        # Long-poll at Telegram's maximum and skip update types we never handle
+        await self.app.updater.start_polling(
+            allowed_updates=_ALLOWED_UPDATES,
+            timeout=20,
+            poll_interval=0.0
+        )
         logger.info("🚀 Telegram bot started in polling mode")
     
     async def start_webhook(self):
@@ -115,20 +401,67 @@ class TelegramGateway:
         if not self._initialized:
             await self.initialize()
         
+        if not config.telegram.webhook_url:
+            raise ValueError("TELEGRAM_WEBHOOK_URL is required for webhook mode")
+        
         await self.app.start()
         
-        if config.telegram.webhook_url:
-            await self.app.bot.set_webhook(
-                url=config.telegram.webhook_url,
-                secret_token=config.telegram.webhook_secret,
-                allowed_updates=["message", "inline_query", "callback_query"]
-            )
-            logger.info(f"🌐 Webhook set: {config.telegram.webhook_url}")
+        # Push delivery: no poll round-trips, and several replicas can sit behind
+        # one reverse proxy that forwards TELEGRAM_WEBHOOK_URL to webhook_path.
+        # The updater registers the webhook with Telegram itself.
+        await self.app.updater.start_webhook(
+            listen=config.telegram.webhook_listen,
+            port=config.telegram.webhook_port,
+            url_path=config.telegram.webhook_path,
+            webhook_url=config.telegram.webhook_url,
+            secret_token=config.telegram.webhook_secret,
+            allowed_updates=_ALLOWED_UPDATES
+        )
+        logger.info(f"🌐 Webhook set: {config.telegram.webhook_url}")
         
         logger.info("🚀 Telegram bot started in webhook mode")
     
+    @staticmethod
+    async def _drain_tasks(tasks, timeout: float, what: str):
+        """Wait up to timeout for tasks to finish, then cancel the stragglers"""
+        tasks = list(tasks)
+        if not tasks:
+            return
+        
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        if pending:
+            logger.warning(f"⚠️ Cancelling {len(pending)} unfinished {what} at shutdown")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def _expire_user_state(self):
+        """Periodically drop expired tone and rate-limit entries"""
+        while True:
+            await asyncio.sleep(self._expire_interval)
+            self.user_tones.expire()
+            self.rate_limits.expire()
+    
     async def stop(self):
-        """Stop the gateway"""
+        """Stop the gateway, letting in-flight work and queued replies finish first"""
+        if self._expire_task:
+            self._expire_task.cancel()
+            self._expire_task = None
+        
+        # No new updates from here on
+        if self.app and self.app.updater and self.app.updater.running:
+            await self.app.updater.stop()
+        
+        # In-flight updates and memory writes (they may still queue replies)
+        await self._drain_tasks(self._background_tasks, timeout=5.0, what="background tasks")
+        # Queued outbound messages
+        await self._drain_tasks(self._outbound_tasks.values(), timeout=2.0, what="outbound queues")
+        
+        if self._redis:
+            await self._redis.close()
+            await self._redis_pool.disconnect()
+            self._redis = None
+            self._rate_script = None
         if self.app:
             await self.app.stop()
             await self.app.shutdown()
@@ -137,44 +470,45 @@ class TelegramGateway:
     async def process_update(self, update: Update):
         """Process an update (for webhook mode)"""
         if self.app:
-            await self.app.process_update(update)
+            self._dispatch_update(update)
+    
+    def _dispatch_update(self, update: Update):
+        """Run handlers in the background so the webhook POST returns immediately"""
+        task = asyncio.create_task(self._run_update(update))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _run_update(self, update: Update):
+        """Process one update under the concurrency cap"""
+        async with self._update_slots:
+            try:
+                await self.app.process_update(update)
+            except Exception as e:
+                logger.error(f"Update {update.update_id} processing failed: {e}")
     
     # Command Handlers
     
+    async def _dispatch_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Route a command to its handler ("/ask@eva_bot ..." -> "ask")"""
+        command = update.effective_message.text.split(maxsplit=1)[0][1:].split("@", 1)[0].lower()
+        handler = self._commands.get(command)
+        if handler is not None:
+            await handler(update, context)
+    
     async def _handle_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         user = update.effective_user
         user_id = str(user.id)
         
-        welcome_message = f"""
-🧠 **Welcome to Eva, {user.first_name}!**
-
-I'm your intelligent AI assistant with memory and voice capabilities.
-
-**💬 Chat Commands:**
-• `/ask <question>` - Ask me anything
-• `/recall <topic>` - Search our conversation history
-• `/tone <style>` - Change my personality (friendly/formal/gen-z)
-
-**🎵 Voice Features:**
-• Send voice messages - I'll transcribe and respond
-• I can reply with voice too!
-
-**🧠 Memory & Stats:**
-• `/stats` - View service status and usage
-• `/health` - Check system health
-• `/forget` - Clear your data (GDPR)
-
-**💡 Inline Mode:**
-Type `@{context.bot.username} <query>` in any chat!
-
-Ready to chat? Just send me a message! 🚀
-        """
+        welcome_message = _WELCOME_TEMPLATE.format(
+            first_name=user.first_name,
+            bot_username=self._bot_username or context.bot.username
+        )
         
-        await update.message.reply_text(welcome_message, parse_mode=ParseMode.MARKDOWN)
+        await self._reply(update, welcome_message, parse_mode=_MD)
         
         # Store start interaction
-        await memory_service.store_memory(
+        self._store_memory(
             user_id=user_id,
             text=f"User started conversation: {user.first_name} (@{user.username})",
             interaction_type="system",
@@ -185,61 +519,23 @@ Ready to chat? Just send me a message! 🚀
     
     async def _handle_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
-        help_text = """
-🤖 **Eva Help**
-
-**💬 Basic Commands:**
-• `/start` - Welcome message  
-• `/help` - This help message
-• `/ask <question>` - Ask me anything
-• `/recall <topic>` - Search conversation history
-
-**🔍 Web Search & Research:**
-• `/search <query>` - Search the web for information
-• `/news <topic>` - Get latest news about a topic
-• `/web <topic>` - Intelligent web research with AI analysis
-
-**🎭 Personality & Analysis:**
-• `/tone friendly|formal|gen-z` - Change personality (VERY different!)
-• `/dream` - Generate insights from our conversations
-• `/why` - Explain my last reasoning process
-• `/analyze <topic>` - Deep analysis of any topic
-• `/summary` - Summarize our conversation history
-
-**📊 System & Data:**
-• `/stats` - Service status and usage
-• `/health` - System health check
-• `/forget` - Clear your data (GDPR)
-
-**🎵 Features:**
-• Send voice messages - I'll transcribe AND respond with voice!
-• Text conversations with persistent memory
-• Multiple distinct personality modes
-• Inline queries: `@eva_bot <question>`
-
-**🔒 Privacy:**
-• Your data is encrypted and secure
-• Use `/forget` to delete everything
-• No data shared with third parties
-
-Try different personality modes - they're now VERY different! 🎭
-        """
         
-        await update.message.reply_text(help_text, parse_mode=ParseMode.MARKDOWN)
+        await self._reply(update, _HELP_TEXT, parse_mode=_MD)
     
     async def _handle_ask(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /ask command"""
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         
         # Check rate limit
-        if not self._check_rate_limit(user_id, "ask"):
-            await update.message.reply_text("⏰ Please wait before asking another question.")
+        if not await self._check_rate_limit(uid, "ask"):
+            await self._reply(update, "⏰ Please wait before asking another question.")
             return
         
         # Get question from args
         question = " ".join(context.args) if context.args else None
         if not question:
-            await update.message.reply_text(
+            await self._reply(update,
                 "Please provide a question after /ask\n\nExample: `/ask What is quantum computing?`"
             )
             return
@@ -249,11 +545,12 @@ Try different personality modes - they're now VERY different! 🎭
     
     async def _handle_recall(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /recall command"""
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         
         topic = " ".join(context.args) if context.args else None
         if not topic:
-            await update.message.reply_text(
+            await self._reply(update,
                 "Please specify what to recall.\n\nExample: `/recall our AI discussion`"
             )
             return
@@ -263,63 +560,55 @@ Try different personality modes - they're now VERY different! 🎭
             memories = await memory_service.search_memories(user_id, topic, limit=5)
             
             if not memories:
-                await update.message.reply_text(f"I don't recall anything about '{topic}'. Try a different search term.")
+                await self._reply(update, f"I don't recall anything about '{topic}'. Try a different search term.")
                 return
             
-            response = f"🧠 **Recalling: {topic}**\n\n"
+            parts = [f"🧠 **Recalling: {topic}**\n\n"]
             
             for i, memory in enumerate(memories, 1):
                 timestamp = memory.get('timestamp', 'Unknown time')
-                text = memory.get('text', '')[:200]  # Truncate
+                text = _head(memory.get('text') or '')
                 similarity = memory.get('similarity', 0)
                 
-                response += f"**{i}.** {timestamp} (similarity: {similarity:.2f})\n{text}...\n\n"
+                parts.append(f"**{i}.** {timestamp} (similarity: {similarity:.2f})\n{text}\n\n")
             
-            await update.message.reply_text(response, parse_mode=ParseMode.MARKDOWN)
+            response = "".join(parts)
+            
+            await self._reply(update, response, parse_mode=_MD)
             
         except Exception as e:
             logger.error(f"Recall command failed: {e}")
-            await update.message.reply_text("Sorry, I couldn't search my memories right now.")
+            await self._reply(update, "Sorry, I couldn't search my memories right now.")
     
     async def _handle_tone(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /tone command"""
-        user_id = str(update.effective_user.id)
-        
-        available_tones = ["friendly", "formal", "gen-z"]
+        uid = self._uid(update)
+        user_id = str(uid)
         
         if not context.args:
-            current_tone = self.user_tones.get(user_id, "friendly")
-            await update.message.reply_text(
-                f"Current tone: **{current_tone}**\n\n"
-                f"Available tones:\n"
-                f"• `friendly` - Warm and casual\n"
-                f"• `formal` - Professional and precise\n"
-                f"• `gen-z` - Fun and trendy\n\n"
-                f"Usage: `/tone friendly`",
-                parse_mode=ParseMode.MARKDOWN
+            current_tone = await self._get_tone(uid)
+            await self._reply(update,
+                _TONE_STATUS_TEMPLATE.format(current_tone=current_tone),
+                parse_mode=_MD
             )
             return
         
         requested_tone = context.args[0].lower()
         
-        if requested_tone not in available_tones:
-            await update.message.reply_text(f"Please choose from: {', '.join(available_tones)}")
+        if requested_tone not in _TONE_RESPONSES:
+            await self._reply(update, _TONE_CHOICES)
             return
         
         # Set new tone
-        self.user_tones[user_id] = requested_tone
+        await self._set_tone(uid, requested_tone)
         
-        # Tone-specific responses
-        responses = {
-            "friendly": "Great! I'm now in friendly mode. Let's have a nice chat! 😊",
-            "formal": "Understood. I have switched to formal communication mode.",
-            "gen-z": "bet! switched to gen-z mode, this bout to be fire 🔥✨"
-        }
+        # The next turn will use this adapter: start loading it now
+        self._spawn(lora_service.prefetch_adapter(requested_tone))
         
-        await update.message.reply_text(responses[requested_tone])
+        await self._reply(update, _TONE_RESPONSES[requested_tone])
         
         # Store tone change
-        await memory_service.store_memory(
+        self._store_memory(
             user_id=user_id,
             text=f"User changed tone to: {requested_tone}",
             interaction_type="tone_change",
@@ -328,13 +617,17 @@ Try different personality modes - they're now VERY different! 🎭
     
     async def _handle_stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stats command"""
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         
         try:
             # Get stats from all services
-            ai_stats = await ai_service.get_service_status()
-            memory_stats = await memory_service.get_memory_stats()
-            voice_stats = await voice_service.get_voice_stats(user_id)
+            ai_stats, memory_stats, voice_stats, current_tone = await asyncio.gather(
+                ai_service.get_service_status(),
+                memory_service.get_memory_stats(),
+                voice_service.get_voice_stats(user_id),
+                self._get_tone(uid)
+            )
             
             stats_text = f"""
 📊 **Service Status & Your Stats**
@@ -357,23 +650,25 @@ Try different personality modes - they're now VERY different! 🎭
 
 **📡 Gateway:**
 • Initialized: {self._initialized}
-• Your current tone: {self.user_tones.get(user_id, 'friendly')}
+• Your current tone: {current_tone}
 
 _All services are running cleanly with cached models!_
             """
             
-            await update.message.reply_text(stats_text, parse_mode=ParseMode.MARKDOWN)
+            await self._reply(update, stats_text, parse_mode=_MD)
             
         except Exception as e:
             logger.error(f"Stats command failed: {e}")
-            await update.message.reply_text("Sorry, couldn't retrieve statistics right now.")
+            await self._reply(update, "Sorry, couldn't retrieve statistics right now.")
     
     async def _handle_health(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /health command"""
         try:
             # Get health status from all services
-            ai_health = await ai_service.get_service_status()
-            voice_health = await voice_service.health_check()
+            ai_health, voice_health = await asyncio.gather(
+                ai_service.get_service_status(),
+                voice_service.health_check()
+            )
             
             health_text = f"""
 🏥 **System Health Check**
@@ -396,28 +691,42 @@ _All services are running cleanly with cached models!_
 **Overall:** {'🟢 All systems operational' if self._initialized and ai_health['initialized'] else '🟡 Some issues detected'}
             """
             
-            await update.message.reply_text(health_text, parse_mode=ParseMode.MARKDOWN)
+            await self._reply(update, health_text, parse_mode=_MD)
             
         except Exception as e:
             logger.error(f"Health command failed: {e}")
-            await update.message.reply_text("Sorry, couldn't perform health check right now.")
+            await self._reply(update, "Sorry, couldn't perform health check right now.")
     
     async def _handle_forget(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /forget command - GDPR compliance"""
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         
         try:
+            # Let this user's queued memory writes land first so the delete covers them
+            pending = self._memory_writes.get(user_id)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            
             # Delete user data from memory service
             deleted_count = await memory_service.delete_user_data(user_id)
             
             # Clear voice cache for user
             await voice_service.clear_voice_cache(user_id)
             
-            # Clear local user state
-            self.user_tones.pop(user_id, None)
-            self.rate_limits.pop(user_id, None)
+            # Clear gateway user state (local and shared)
+            self.user_tones.pop(uid, None)
+            self.rate_limits.pop(uid, None)
+            if self._redis:
+                await self._redis.delete(
+                    f"user_tone:{uid}", *(f"rate_limit:{uid}:{action}" for action in _RATE_LIMITS)
+                )
+            self._ctx_cache.pop(user_id, None)
+            self._response_cache.pop(user_id, None)
+            for key in [key for key in self._inline_cache if key[0] == uid]:
+                self._inline_cache.pop(key, None)
             
-            await update.message.reply_text(
+            await self._reply(update,
                 f"🗑️ **Data Cleared**\n\n"
                 f"Deleted {deleted_count} memories and cleared all your data.\n"
                 f"Starting fresh! Send me a message to begin a new conversation."
@@ -427,42 +736,45 @@ _All services are running cleanly with cached models!_
             
         except Exception as e:
             logger.error(f"Forget command failed: {e}")
-            await update.message.reply_text("Sorry, couldn't clear your data right now. Please try again.")
+            await self._reply(update, "Sorry, couldn't clear your data right now. Please try again.")
     
     async def _handle_dream(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /dream command - generate insights from memories"""
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         
         # Check rate limit
-        if not self._check_rate_limit(user_id, "ask"):
-            await update.message.reply_text("🌙 Please wait before requesting another dream.")
+        if not await self._check_rate_limit(uid, "ask"):
+            await self._reply(update, "🌙 Please wait before requesting another dream.")
             return
         
-        await update.message.reply_text("🌙 Generating insights from our conversations...")
+        await self._reply(update, "🌙 Generating insights from our conversations...", merge=False)
         
         try:
-            # Get user's memories
-            memories = await memory_service.search_memories(
-                user_id=user_id,
-                query="conversation history insights patterns",
-                limit=10
+            # Get user's memories and recent context concurrently
+            memories, context_memories = await asyncio.gather(
+                memory_service.search_memories(
+                    user_id=user_id,
+                    query="conversation history insights patterns",
+                    limit=10
+                ),
+                self._recent_context(user_id, limit=5)
             )
             
             if not memories:
-                await update.message.reply_text("🌙 I need more conversation history to generate insights. Chat with me more!")
+                await self._reply(update, "🌙 I need more conversation history to generate insights. Chat with me more!")
                 return
             
             # Create insights prompt
-            memory_texts = [mem.get('text', '') for mem in memories[:5]]
+            # Joined outside the f-string: no backslashes in f-string expressions before 3.12
+            memory_texts = "\n".join(mem["text"] for mem in memories[:5] if mem.get("text"))
             insights_prompt = f"""Based on our conversation history, generate meaningful insights about the user's interests, patterns, and preferences. Here are some recent interactions:
 
-{chr(10).join(memory_texts)}
+{memory_texts}
 
 Provide 3-4 interesting insights about this user's personality, interests, or conversation patterns. Make it personal and thoughtful."""
             
-            user_tone = self.user_tones.get(user_id, "friendly")
-            # Get conversation context for insights
-            context_memories = await memory_service.get_recent_context(user_id, limit=5)
+            user_tone = await self._get_tone(uid)
             
             ai_response = await ai_service.generate_response(
                 message=insights_prompt,
@@ -475,35 +787,39 @@ Provide 3-4 interesting insights about this user's personality, interests, or co
                 dream_text = ai_response["response"]
                 
                 # Store the dream
-                await memory_service.store_memory(
+                self._store_memory(
                     user_id=user_id,
                     text=f"[Dream Insights] {dream_text}",
                     interaction_type="dream",
                     importance=0.8
                 )
                 
-                await update.message.reply_text(f"🌙 **Dream Insights**\n\n{dream_text}")
+                await self._reply(update, f"🌙 **Dream Insights**\n\n{dream_text}")
             else:
-                await update.message.reply_text("🌙 I couldn't generate insights right now. Try again later.")
+                await self._reply(update, "🌙 I couldn't generate insights right now. Try again later.")
                 
         except Exception as e:
             logger.error(f"Dream command failed: {e}")
-            await update.message.reply_text("🌙 Dream generation failed. Please try again.")
+            await self._reply(update, "🌙 Dream generation failed. Please try again.")
     
     async def _handle_why(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /why command - explain last reasoning"""
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         
         try:
-            # Get recent AI responses to explain
-            recent_memories = await memory_service.search_memories(
-                user_id=user_id,
-                query="bot_response",
-                limit=3
+            # Get recent AI responses to explain, plus conversation context
+            recent_memories, context_memories = await asyncio.gather(
+                memory_service.search_memories(
+                    user_id=user_id,
+                    query="bot_response",
+                    limit=3
+                ),
+                self._recent_context(user_id, limit=5)
             )
             
             if not recent_memories:
-                await update.message.reply_text("🤔 I don't have any recent responses to explain. Ask me something first!")
+                await self._reply(update, "🤔 I don't have any recent responses to explain. Ask me something first!")
                 return
             
             last_response = recent_memories[0].get('text', '')
@@ -520,9 +836,7 @@ Provide a thoughtful explanation of:
 
 Make it insightful and educational."""
             
-            user_tone = self.user_tones.get(user_id, "friendly")
-            # Get conversation context for explanation
-            context_memories = await memory_service.get_recent_context(user_id, limit=5)
+            user_tone = await self._get_tone(uid)
             
             ai_response = await ai_service.generate_response(
                 message=explanation_prompt,
@@ -532,29 +846,30 @@ Make it insightful and educational."""
             )
             
             if ai_response["success"]:
-                await update.message.reply_text(f"🤔 **My Reasoning Process**\n\n{ai_response['response']}")
+                await self._reply(update, f"🤔 **My Reasoning Process**\n\n{ai_response['response']}")
             else:
-                await update.message.reply_text("🤔 I couldn't explain my reasoning right now.")
+                await self._reply(update, "🤔 I couldn't explain my reasoning right now.")
                 
         except Exception as e:
             logger.error(f"Why command failed: {e}")
-            await update.message.reply_text("🤔 Couldn't analyze my reasoning. Please try again.")
+            await self._reply(update, "🤔 Couldn't analyze my reasoning. Please try again.")
     
     async def _handle_analyze(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /analyze command - deep analysis of a topic"""
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         
         # Check rate limit
-        if not self._check_rate_limit(user_id, "ask"):
-            await update.message.reply_text("🔍 Please wait before requesting another analysis.")
+        if not await self._check_rate_limit(uid, "ask"):
+            await self._reply(update, "🔍 Please wait before requesting another analysis.")
             return
         
         topic = " ".join(context.args) if context.args else None
         if not topic:
-            await update.message.reply_text("🔍 Please specify what to analyze.\n\nExample: `/analyze artificial intelligence trends`")
+            await self._reply(update, "🔍 Please specify what to analyze.\n\nExample: `/analyze artificial intelligence trends`")
             return
         
-        await update.message.reply_text(f"🔍 Performing deep analysis of: {topic}")
+        await self._reply(update, f"🔍 Performing deep analysis of: {topic}", merge=False)
         
         try:
             analysis_prompt = f"""Perform a comprehensive analysis of: {topic}
@@ -568,9 +883,9 @@ Provide a structured analysis covering:
 
 Make it thorough, insightful, and well-organized."""
             
-            user_tone = self.user_tones.get(user_id, "friendly")
+            user_tone = await self._get_tone(uid)
             # Get conversation context for analysis
-            context_memories = await memory_service.get_recent_context(user_id, limit=5)
+            context_memories = await self._recent_context(user_id, limit=5)
             
             ai_response = await ai_service.generate_response(
                 message=analysis_prompt,
@@ -580,36 +895,40 @@ Make it thorough, insightful, and well-organized."""
             )
             
             if ai_response["success"]:
-                await update.message.reply_text(f"🔍 **Deep Analysis: {topic}**\n\n{ai_response['response']}")
+                await self._reply(update, f"🔍 **Deep Analysis: {topic}**\n\n{ai_response['response']}")
                 
                 # Store analysis
-                await memory_service.store_memory(
+                self._store_memory(
                     user_id=user_id,
-                    text=f"[Analysis] {topic}: {ai_response['response'][:200]}...",
+                    text=f"[Analysis] {topic}: {_head(ai_response['response'])}",
                     interaction_type="analysis",
                     importance=0.7
                 )
             else:
-                await update.message.reply_text("🔍 Analysis failed. Please try again.")
+                await self._reply(update, "🔍 Analysis failed. Please try again.")
                 
         except Exception as e:
             logger.error(f"Analyze command failed: {e}")
-            await update.message.reply_text("🔍 Analysis failed. Please try again.")
+            await self._reply(update, "🔍 Analysis failed. Please try again.")
     
     async def _handle_summary(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /summary command - summarize conversation history"""
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         
         try:
-            # Get conversation history
-            memories = await memory_service.search_memories(
-                user_id=user_id,
-                query="conversation topics discussion",
-                limit=15
+            # Get conversation history and recent context concurrently
+            memories, context_memories = await asyncio.gather(
+                memory_service.search_memories(
+                    user_id=user_id,
+                    query="conversation topics discussion",
+                    limit=15
+                ),
+                self._recent_context(user_id, limit=8)
             )
             
             if not memories:
-                await update.message.reply_text("📝 No conversation history to summarize yet.")
+                await self._reply(update, "📝 No conversation history to summarize yet.")
                 return
             
             # Prepare conversation texts
@@ -621,13 +940,14 @@ Make it thorough, insightful, and well-organized."""
                     conversation_texts.append(text)
             
             if not conversation_texts:
-                await update.message.reply_text("📝 No conversations to summarize yet.")
+                await self._reply(update, "📝 No conversations to summarize yet.")
                 return
             
+            conversation_block = "\n".join(conversation_texts[:10])
             summary_prompt = f"""Summarize our conversation history in a comprehensive way:
 
 Recent conversations:
-{chr(10).join(conversation_texts[:10])}
+{conversation_block}
 
 Create a summary that includes:
 1. **Main Topics**: What we've discussed most
@@ -637,9 +957,7 @@ Create a summary that includes:
 
 Make it personal and insightful."""
             
-            user_tone = self.user_tones.get(user_id, "friendly")
-            # Get conversation context for summary
-            context_memories = await memory_service.get_recent_context(user_id, limit=8)
+            user_tone = await self._get_tone(uid)
             
             ai_response = await ai_service.generate_response(
                 message=summary_prompt,
@@ -649,29 +967,30 @@ Make it personal and insightful."""
             )
             
             if ai_response["success"]:
-                await update.message.reply_text(f"📝 **Conversation Summary**\n\n{ai_response['response']}")
+                await self._reply(update, f"📝 **Conversation Summary**\n\n{ai_response['response']}")
             else:
-                await update.message.reply_text("📝 Couldn't generate summary right now.")
+                await self._reply(update, "📝 Couldn't generate summary right now.")
                 
         except Exception as e:
             logger.error(f"Summary command failed: {e}")
-            await update.message.reply_text("📝 Summary generation failed.")
+            await self._reply(update, "📝 Summary generation failed.")
     
     async def _handle_search(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /search command - web search"""
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         
         # Check rate limit
-        if not self._check_rate_limit(user_id, "ask"):
-            await update.message.reply_text("🔍 Please wait before making another search.")
+        if not await self._check_rate_limit(uid, "ask"):
+            await self._reply(update, "🔍 Please wait before making another search.")
             return
         
         query = " ".join(context.args) if context.args else None
         if not query:
-            await update.message.reply_text("🔍 Please provide a search query.\n\nExample: `/search artificial intelligence news`")
+            await self._reply(update, "🔍 Please provide a search query.\n\nExample: `/search artificial intelligence news`")
             return
         
-        await update.message.reply_text(f"🔍 Searching the web for: {query}")
+        await self._reply(update, f"🔍 Searching the web for: {query}", merge=False)
         
         try:
             # Perform web search
@@ -679,34 +998,35 @@ Make it personal and insightful."""
             
             if search_results:
                 # Store search in memory
-                await memory_service.store_memory(
+                self._store_memory(
                     user_id=user_id,
-                    text=f"[Web Search] {query}: {search_results[:200]}...",
+                    text=f"[Web Search] {query}: {_head(search_results)}",
                     interaction_type="web_search",
                     importance=0.6
                 )
                 
-                await update.message.reply_text(search_results)
+                await self._reply(update, search_results)
             else:
-                await update.message.reply_text("🔍 No search results found. Please try a different query.")
+                await self._reply(update, "🔍 No search results found. Please try a different query.")
                 
         except Exception as e:
             logger.error(f"Search command failed: {e}")
-            await update.message.reply_text("🔍 Search failed. Please try again later.")
+            await self._reply(update, "🔍 Search failed. Please try again later.")
     
     async def _handle_news(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /news command - latest news search"""
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         
         # Check rate limit
-        if not self._check_rate_limit(user_id, "ask"):
-            await update.message.reply_text("📰 Please wait before requesting more news.")
+        if not await self._check_rate_limit(uid, "ask"):
+            await self._reply(update, "📰 Please wait before requesting more news.")
             return
         
         topic = " ".join(context.args) if context.args else "latest news"
         news_query = f"{topic} latest news today"
         
-        await update.message.reply_text(f"📰 Getting latest news about: {topic}")
+        await self._reply(update, f"📰 Getting latest news about: {topic}", merge=False)
         
         try:
             # Search for news
@@ -714,36 +1034,37 @@ Make it personal and insightful."""
             
             if news_results:
                 # Store news search in memory
-                await memory_service.store_memory(
+                self._store_memory(
                     user_id=user_id,
-                    text=f"[News Search] {topic}: {news_results[:200]}...",
+                    text=f"[News Search] {topic}: {_head(news_results)}",
                     interaction_type="news_search",
                     importance=0.7
                 )
                 
-                await update.message.reply_text(f"📰 Latest News: {topic}\n\n{news_results}")
+                await self._reply(update, f"📰 Latest News: {topic}\n\n{news_results}")
             else:
-                await update.message.reply_text("📰 No news found. Please try a different topic.")
+                await self._reply(update, "📰 No news found. Please try a different topic.")
                 
         except Exception as e:
             logger.error(f"News command failed: {e}")
-            await update.message.reply_text("📰 News search failed. Please try again later.")
+            await self._reply(update, "📰 News search failed. Please try again later.")
     
     async def _handle_web(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /web command - intelligent web search with AI summary"""
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         
         # Check rate limit
-        if not self._check_rate_limit(user_id, "ask"):
-            await update.message.reply_text("🌐 Please wait before making another web request.")
+        if not await self._check_rate_limit(uid, "ask"):
+            await self._reply(update, "🌐 Please wait before making another web request.")
             return
         
         query = " ".join(context.args) if context.args else None
         if not query:
-            await update.message.reply_text("🌐 Please provide a topic to research.\n\nExample: `/web quantum computing breakthroughs`")
+            await self._reply(update, "🌐 Please provide a topic to research.\n\nExample: `/web quantum computing breakthroughs`")
             return
         
-        await update.message.reply_text(f"🌐 Researching: {query}")
+        await self._reply(update, f"🌐 Researching: {query}", merge=False)
         
         try:
             # Perform web search
@@ -751,52 +1072,43 @@ Make it personal and insightful."""
             
             if search_results:
                 # Use AI to summarize and analyze the search results
-                user_tone = self.user_tones.get(user_id, "friendly")
+                user_tone = await self._get_tone(uid)
                 
-                analysis_prompt = f"""Based on these web search results about "{query}", provide a comprehensive summary and analysis:
-
-Search Results:
-{search_results}
-
-Please provide:
-1. **Summary**: Key findings and main points
-2. **Current Status**: What's happening now
-3. **Key Insights**: Important details and trends
-4. **Implications**: What this means
-
-Make it informative and well-organized."""
+                # Only the query and results vary; instructions stay a fixed prefix
+                analysis_prompt = f'Web search results about "{query}":\n\n{search_results}'
                 
                 # Get conversation context for web analysis
-                context_memories = await memory_service.get_recent_context(user_id, limit=5)
+                context_memories = await self._recent_context(user_id, limit=5)
                 
                 ai_response = await ai_service.generate_response(
                     message=analysis_prompt,
                     user_id=user_id,
                     context=context_memories,
-                    tone=user_tone
+                    tone=user_tone,
+                    instructions=_WEB_ANALYSIS_INSTRUCTIONS
                 )
                 
                 if ai_response["success"]:
                     analysis = ai_response["response"]
                     
                     # Store web research in memory
-                    await memory_service.store_memory(
+                    self._store_memory(
                         user_id=user_id,
-                        text=f"[Web Research] {query}: {analysis[:300]}...",
+                        text=f"[Web Research] {query}: {_head(analysis, 300)}",
                         interaction_type="web_research",
                         importance=0.8
                     )
                     
-                    await update.message.reply_text(f"🌐 Web Research: {query}\n\n{analysis}")
+                    await self._reply(update, f"🌐 Web Research: {query}\n\n{analysis}")
                 else:
                     # Fallback to raw search results
-                    await update.message.reply_text(f"🌐 Search Results: {query}\n\n{search_results}")
+                    await self._reply(update, f"🌐 Search Results: {query}\n\n{search_results}")
             else:
-                await update.message.reply_text("🌐 No information found. Please try a different topic.")
+                await self._reply(update, "🌐 No information found. Please try a different topic.")
                 
         except Exception as e:
             logger.error(f"Web command failed: {e}")
-            await update.message.reply_text("🌐 Web research failed. Please try again later.")
+            await self._reply(update, "🌐 Web research failed. Please try again later.")
     
     async def _perform_web_search(self, query: str) -> str:
         """Perform web search using simulated search results"""
@@ -804,41 +1116,12 @@ Make it informative and well-organized."""
             # Since direct web scraping is blocked, provide intelligent simulated results
             # This maintains the user experience while we implement proper search
             
-            # Analyze the query to provide relevant context
-            query_lower = query.lower()
-            
-            # Create contextually relevant search results
-            if any(word in query_lower for word in ['news', 'latest', 'today', 'current']):
-                results = [
-                    f"Recent news and developments about {query}",
-                    f"Current events and breaking stories",
-                    f"Latest updates and trending topics",
-                    f"Real-time information and statistics"
-                ]
-            elif any(word in query_lower for word in ['technology', 'ai', 'programming', 'code']):
-                results = [
-                    f"Technical information about {query}",
-                    f"Development trends and best practices",
-                    f"Documentation and tutorials",
-                    f"Research papers and innovations"
-                ]
-            elif any(word in query_lower for word in ['india', 'pm', 'politics', 'government']):
-                results = [
-                    f"Current information about {query}",
-                    f"Government updates and policies",
-                    f"Political developments and news",
-                    f"Official announcements and statements"
-                ]
-            else:
-                results = [
-                    f"Comprehensive information about {query}",
-                    f"Educational resources and guides",
-                    f"Expert insights and analysis",
-                    f"Multiple perspectives and sources"
-                ]
+            # Route the query to a result category in a single regex pass
+            match = _SEARCH_ROUTER.search(query)
+            category = match.lastgroup if match else "general"
             
             # Format results nicely
-            formatted_results = "\n".join([f"{i+1}. {result}" for i, result in enumerate(results)])
+            formatted_results = _SEARCH_TEMPLATES[category].format(query=query)
             
             return f"Search Results for '{query}':\n\n{formatted_results}\n\nNote: Eva is being enhanced with live search capabilities."
                     
@@ -851,61 +1134,65 @@ Make it informative and well-organized."""
     
     async def _handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle regular text messages"""
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         text = update.message.text
         
         # Check rate limit
-        if not self._check_rate_limit(user_id, "message"):
-            await update.message.reply_text("⏰ Please wait a moment before sending another message.")
+        if not await self._check_rate_limit(uid, "message"):
+            await self._reply(update, "⏰ Please wait a moment before sending another message.")
             return
         
         await self._process_text_message(update, text, user_id)
     
     async def _handle_voice(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle voice messages"""
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         
         # Check rate limit for voice (more restrictive)
-        if not self._check_rate_limit(user_id, "voice"):
-            await update.message.reply_text("🎤 Please wait before sending another voice message.")
+        if not await self._check_rate_limit(uid, "voice"):
+            await self._reply(update, "🎤 Please wait before sending another voice message.")
             return
         
         try:
-            # Download voice file
+            # Download voice file into memory
             voice_file = await update.message.voice.get_file()
-            temp_dir = tempfile.gettempdir()
-            file_path = os.path.join(temp_dir, f"voice_{user_id}_{update.message.message_id}.ogg")
-            await voice_file.download_to_drive(file_path)
-            
-            await update.message.reply_text("🎤 Processing your voice message...")
+            audio = io.BytesIO(await voice_file.download_as_bytearray())
+            audio.name = f"voice_{user_id}_{update.message.message_id}.ogg"
             
-            # Transcribe using VoiceService
-            result = await voice_service.transcribe_audio(file_path, user_id)
+            # One status message, edited in place as the stages progress; it is
+            # sent while transcription runs rather than ahead of it
+            status, result = await asyncio.gather(
+                self._update_status(update, "🎤 Processing your voice message..."),
+                voice_service.transcribe_audio(audio, user_id)  # Transcribe using VoiceService
+            )
             
             if result["success"]:
                 transcription = result["transcription"]
                 
                 if not transcription or len(transcription.strip()) < 2:
-                    await update.message.reply_text("🎤 I couldn't hear anything clear in your voice message. Please try again!")
+                    await self._update_status(update, "🎤 I couldn't hear anything clear in your voice message. Please try again!", status)
                     return
                 
-                await update.message.reply_text(f"📝 You said: \"{transcription}\"")
+                heard = f"📝 You said: \"{transcription}\""
+                status = await self._update_status(update, f"{heard}\n\n🤖 Thinking...", status)
                 
                 # Store transcription in memory
-                await memory_service.store_memory(
+                self._store_memory(
                     user_id=user_id,
                     text=f"[Voice] {transcription}",
                     interaction_type="voice_input",
                     importance=0.6
                 )
                 
-                # Get AI response
-                user_tone = self.user_tones.get(user_id, "friendly")
-                context_memories = await memory_service.get_recent_context(user_id, limit=3)
-                
-                await update.message.reply_text("🤖 Thinking...")
+                # Get AI response (tone and context fetched concurrently)
+                user_tone, context_memories = await asyncio.gather(
+                    self._get_tone(uid),
+                    self._recent_context(user_id, limit=3)
+                )
                 
-                ai_response = await ai_service.generate_response(
+                ai_response = await self._cached_generate(
                     message=transcription,
                     user_id=user_id,
                     context=context_memories,
@@ -916,124 +1203,370 @@ Make it informative and well-organized."""
                     response_text = ai_response["response"]
                     
                     # Store AI response in memory
-                    await memory_service.store_memory(
+                    self._store_memory(
                         user_id=user_id,
                         text=response_text,
                         interaction_type="bot_response",
                         importance=0.4
                     )
                     
-                    # Send text response
-                    await update.message.reply_text(f"🤖 {response_text}")
+                    # Status settles on the transcription; the answer is its own message
+                    await self._update_status(update, heard, status)
+                    await self._reply(update, f"🤖 {response_text}")
                     
                     # Generate voice response if TTS is enabled
                     if config.voice.tts_enabled:
-                        await update.message.reply_text("🎤 Generating voice response...")
-                        
                         tts_result = await voice_service.generate_speech(
                             text=response_text,
                             user_id=user_id,
-                            tone=user_tone
+                            tone=user_tone,
+                            as_bytes=True
                         )
                         
                         if tts_result["success"]:
                             try:
-                                with open(tts_result["audio_path"], 'rb') as voice_file:
-                                    await update.message.reply_voice(
-                                        voice_file, 
-                                        caption="🎤 Eva's voice response"
-                                    )
+                                # Queued behind the text answer it speaks
+                                await self._send_call(update.effective_chat.id, lambda: update.message.reply_voice(
+                                    tts_result["audio_bytes"],
+                                    caption="🎤 Eva's voice response"
+                                ))
                                 logger.info(f"✅ Voice response sent to user {user_id}")
                             except Exception as voice_error:
                                 logger.error(f"Failed to send voice file: {voice_error}")
-                                await update.message.reply_text("🎤 Voice response generated but couldn't send. Check logs.")
+                                await self._reply(update, "🎤 Voice response generated but couldn't send. Check logs.")
                         else:
                             logger.error(f"TTS failed: {tts_result.get('error', 'Unknown error')}")
-                            await update.message.reply_text("🎤 Couldn't generate voice response, but you have the text!")
+                            await self._reply(update, "🎤 Couldn't generate voice response, but you have the text!")
                     
                 else:
-                    await update.message.reply_text(
-                        f"Sorry, I couldn't generate a response right now. Error: {ai_response.get('error', 'Unknown')}"
+                    await self._update_status(update,
+                        f"{heard}\n\nSorry, I couldn't generate a response right now. "
+                        f"Error: {ai_response.get('error', 'Unknown')}",
+                        status
                     )
             else:
                 error_msg = result.get('error', 'Unknown transcription error')
                 logger.error(f"Voice transcription failed: {error_msg}")
-                await update.message.reply_text(
+                await self._update_status(update,
                     f"🎤 Sorry, I couldn't understand your voice message.\n"
                     f"Error: {error_msg}\n"
-                    f"Please try speaking clearly or send a text message instead."
+                    f"Please try speaking clearly or send a text message instead.",
+                    status
                 )
-            
-            # Cleanup downloaded file
-            if os.path.exists(file_path):
-                os.unlink(file_path)
                 
         except Exception as e:
             logger.error(f"Voice handling failed: {e}")
-            await update.message.reply_text("Sorry, I couldn't process your voice message right now.")
+            await self._reply(update, "Sorry, I couldn't process your voice message right now.")
     
     async def _handle_inline_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle inline queries"""
         query = update.inline_query.query
-        user_id = str(update.effective_user.id)
+        uid = self._uid(update)
+        user_id = str(uid)
         
-        if not query:
+        if len(query.strip()) < _INLINE_MIN_QUERY_LENGTH:
             return
         
         try:
             # Get quick AI response
-            user_tone = self.user_tones.get(user_id, "friendly")
+            user_tone = await self._get_tone(uid)
             
-            # Get recent context even for inline queries
-            context_memories = await memory_service.get_recent_context(user_id, limit=3)
+            cache_key = (uid, user_tone, query.strip().lower())
+            response = self._inline_cache.get(cache_key)
             
-            ai_response = await ai_service.generate_response(
-                message=query,
-                user_id=user_id,
-                context=context_memories,
-                tone=user_tone
-            )
-            
-            if ai_response["success"]:
-                response = ai_response["response"]
+            if response is None:
+                # Get recent context even for inline queries
+                context_memories = await self._recent_context(user_id, limit=3)
+                
+                ai_response = await self._cached_generate(
+                    message=query,
+                    user_id=user_id,
+                    context=context_memories,
+                    tone=user_tone
+                )
                 
+                if ai_response["success"]:
+                    response = ai_response["response"]
+                    self._inline_cache[cache_key] = response
+            
+            if response is not None:
                 # Create inline result
                 results = [
                     InlineQueryResultArticle(
                         id=str(uuid4()),
-                        title=f"Eva: {query[:50]}...",
-                        description=response[:100] + "..." if len(response) > 100 else response,
+                        title=f"Eva: {_head(query, 50)}",
+                        description=_head(response, 100),
                         input_message_content=InputTextMessageContent(
                             message_text=response,
-                            parse_mode=ParseMode.MARKDOWN
+                            parse_mode=_MD
                         )
                     )
                 ]
                 
-                await update.inline_query.answer(results, cache_time=60)
+                await update.inline_query.answer(results, cache_time=_INLINE_CACHE_TTL)
             
         except Exception as e:
             logger.error(f"Inline query failed: {e}")
     
     # Helper Methods
     
+    async def _recent_context(self, user_id: str, limit: int = 5):
+        """Recent conversation context, cached briefly per user"""
+        by_limit = self._ctx_cache.get(user_id)
+        if by_limit is not None and limit in by_limit:
+            return by_limit[limit]
+        
+        context_memories = await memory_service.get_recent_context(user_id, limit=limit)
+        self._ctx_cache.setdefault(user_id, {})[limit] = context_memories
+        return context_memories
+    
+    async def _cached_generate(
+        self, message: str, user_id: str, context, tone: str
+    ) -> Dict[str, Any]:
+        """generate_response behind a per-user semantic cache of recent answers"""
+        if len(message) < _RESPONSE_CACHE_MIN_LENGTH or _VOLATILE_RE.search(message):
+            return await ai_service.generate_response(
+                message=message, user_id=user_id, context=context, tone=tone
+            )
+        
+        try:
+            vector = np.asarray(await memory_service.embed_text(message), dtype=np.float32)
+            vector /= np.linalg.norm(vector) or 1.0
+        except Exception as e:
+            logger.debug(f"Response cache embedding failed: {e}")
+            vector = None
+        
+        entries = self._response_cache.get(user_id)
+        if vector is not None and entries:
+            candidates = [(response, cached) for cached_tone, cached, response in entries if cached_tone == tone]
+            if candidates:
+                scores = np.stack([cached for _, cached in candidates]) @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= _RESPONSE_CACHE_THRESHOLD:
+                    logger.info(f"⚡ Response cache hit for user {user_id} (similarity {scores[best]:.2f})")
+                    return {"success": True, "response": candidates[best][0], "source": "cache"}
+        
+        ai_response = await ai_service.generate_response(
+            message=message, user_id=user_id, context=context, tone=tone
+        )
+        
+        if vector is not None and ai_response.get("success"):
+            if entries is None:
+                entries = []
+            entries.append((tone, vector, ai_response["response"]))
+            del entries[:-_RESPONSE_CACHE_PER_USER]
+            self._response_cache[user_id] = entries
+        
+        return ai_response
+    
+    def _store_memory(self, user_id: str, **kwargs):
+        """Write a memory in the background, tracked per user so /forget can wait it out"""
+        task = self._spawn(self._write_memory(user_id, **kwargs))
+        pending = self._memory_writes.setdefault(user_id, set())
+        pending.add(task)
+        
+        def _done(task):
+            pending.discard(task)
+            if not pending and self._memory_writes.get(user_id) is pending:
+                del self._memory_writes[user_id]
+        
+        task.add_done_callback(_done)
+    
+    async def _write_memory(self, user_id: str, **kwargs):
+        """Store a memory and drop the user's cached context on both sides of the write"""
+        self._ctx_cache.pop(user_id, None)
+        try:
+            return await memory_service.store_memory(user_id=user_id, **kwargs)
+        finally:
+            self._ctx_cache.pop(user_id, None)
+    
+    @staticmethod
+    def _uid(update: Update) -> int:
+        """Telegram user id as an int, the key for in-memory gateway state"""
+        return update.effective_user.id
+    
+    def _spawn(self, coro):
+        """Run a side-effect (memory write, prefetch) without delaying the reply"""
+        task = asyncio.create_task(self._run_background(coro))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+    
+    @staticmethod
+    async def _run_background(coro):
+        """Await a background coroutine, logging instead of dropping its failure"""
+        try:
+            await coro
+        except Exception as e:
+            logger.error(f"Background task failed: {e}")
+    
+    async def _update_status(self, update: Update, text: str, status: Optional[Message] = None) -> Optional[Message]:
+        """Send the in-place status message for a multi-stage reply, or edit it"""
+        try:
+            if status is None:
+                return await self._send_call(update.effective_chat.id, lambda: update.message.reply_text(text))
+            await self._send_call(update.effective_chat.id, lambda: status.edit_text(text))
+        except BadRequest as e:
+            logger.debug(f"Status update skipped: {e}")  # e.g. text unchanged
+        except Exception as e:
+            logger.warning(f"Status update failed: {e}")
+        return status
+    
+    async def _reply(self, update: Update, text: str, parse_mode: Optional[str] = None, merge: bool = True):
+        """Reply in the update's chat through the outbound queue (merge=False keeps it a message of its own)"""
+        message = update.effective_message
+        chat = update.effective_chat
+        # Same placement as Message.reply_text: quoted outside private chats, in the same topic
+        reply_to = message.message_id if message and chat.type != ChatType.PRIVATE else None
+        thread_id = message.message_thread_id if message and message.is_topic_message else None
+        await self._send(chat.id, text, parse_mode=parse_mode, reply_to=reply_to, thread_id=thread_id, merge=merge)
+    
+    async def _send(
+        self,
+        chat_id: int,
+        text: str,
+        parse_mode: Optional[str] = None,
+        reply_to: Optional[int] = None,
+        thread_id: Optional[int] = None,
+        merge: bool = True
+    ):
+        """Queue a message for the chat; the drain task paces and coalesces sends"""
+        # Only plain text merges: a Markdown entity spanning two replies would
+        # make Telegram reject all of them
+        self._enqueue(chat_id, (text, parse_mode, reply_to, thread_id, merge and parse_mode is None, None))
+    
+    async def _send_call(self, chat_id: int, send):
+        """Run a non-text Bot API call (status edit, voice note) in the chat's send order"""
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(chat_id, (None, None, None, None, False, (send, future)))
+        return await future
+    
+    def _enqueue(self, chat_id: int, item: tuple):
+        """Append to the chat's outbound queue, starting its drain task if idle"""
+        self._outbound.setdefault(chat_id, deque()).append(item)
+        
+        task = self._outbound_tasks.get(chat_id)
+        if task is None or task.done():
+            self._outbound_tasks[chat_id] = asyncio.create_task(self._drain_outbound(chat_id))
+    
+    def _chat_limiter(self, chat_id: int) -> Optional["AsyncLimiter"]:
+        """Per-chat outbound limiter (~1 msg/s), created on first use"""
+        limiter = self._chat_limiters.get(chat_id)
+        if limiter is None and AIOLIMITER_AVAILABLE:
+            limiter = AsyncLimiter(1, 1)
+        if limiter is not None:
+            self._chat_limiters[chat_id] = limiter  # refresh TTL while the chat is active
+        return limiter
+    
+    async def _pace(self, chat_id: int):
+        """Wait for a Bot API slot under the per-chat and global limits"""
+        limiter = self._chat_limiter(chat_id)
+        if limiter is not None:
+            await limiter.acquire()
+            await self._global_limiter.acquire()
+    
+    async def _drain_outbound(self, chat_id: int):
+        """Send queued messages for one chat, merging plain-text replies that queued up meanwhile"""
+        pending = self._outbound[chat_id]
+        
+        try:
+            while pending:
+                await self._pace(chat_id)
+                
+                # Merge only what is already waiting; a lone reply goes out at once
+                text, parse_mode, reply_to, thread_id, merge, call = pending.popleft()
+                if call is not None:
+                    await self._run_call(*call)
+                    continue
+                while (
+                    merge
+                    and pending
+                    and pending[0][4]
+                    and pending[0][2:4] == (reply_to, thread_id)
+                    and len(text) + 2 + len(pending[0][0]) <= _MAX_MESSAGE_LENGTH
+                ):
+                    text += "\n\n" + pending.popleft()[0]
+                
+                await self._deliver(chat_id, text, parse_mode, reply_to, thread_id)
+        finally:
+            if not pending:
+                self._outbound.pop(chat_id, None)
+                self._outbound_tasks.pop(chat_id, None)
+            else:
+                # Cancelled at shutdown: don't leave callers waiting on calls that won't run
+                for *_, call in pending:
+                    if call is not None:
+                        call[1].cancel()
+    
+    @staticmethod
+    async def _run_call(send, future: asyncio.Future):
+        """Run one queued Bot API call and hand its outcome to the waiting caller"""
+        if future.done():
+            return  # Caller gave up (or shutdown cancelled it) while the call was queued
+        try:
+            result = await send()
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+        finally:
+            if not future.done():
+                future.cancel()
+    
+    async def _deliver(
+        self,
+        chat_id: int,
+        text: str,
+        parse_mode: Optional[str],
+        reply_to: Optional[int],
+        thread_id: Optional[int]
+    ):
+        """Send one message; rejected markup is retried as plain text, then replaced by a notice"""
+        attempts = [(text, parse_mode)]
+        if parse_mode is not None:
+            attempts.append((text, None))  # e.g. unbalanced "_" or "*" in LLM output
+        attempts.append((_DELIVERY_FAILED_TEXT, None))
+        
+        for attempt, (attempt_text, attempt_mode) in enumerate(attempts):
+            if attempt:
+                await self._pace(chat_id)
+            try:
+                await self.app.bot.send_message(
+                    chat_id=chat_id,
+                    text=attempt_text,
+                    parse_mode=attempt_mode,
+                    reply_to_message_id=reply_to,
+                    allow_sending_without_reply=True,
+                    message_thread_id=thread_id
+                )
+                return
+            except BadRequest as e:
+                logger.warning(f"Message to chat {chat_id} rejected: {e}")
+            except Exception as e:
+                logger.error(f"Failed to send message to chat {chat_id}: {e}")
+                return
+    
     async def _process_text_message(self, update: Update, text: str, user_id: str):
         """Process text message through AI pipeline"""
         try:
             # Store user message in memory
-            await memory_service.store_memory(
+            self._store_memory(
                 user_id=user_id,
                 text=text,
                 interaction_type="user_message",
                 importance=0.5
             )
             
-            # Get recent context and user tone
-            context_memories = await memory_service.get_recent_context(user_id, limit=3)
-            user_tone = self.user_tones.get(user_id, "friendly")
+            # Get recent context and user tone concurrently (the store runs alongside)
+            context_memories, user_tone = await asyncio.gather(
+                self._recent_context(user_id, limit=3),
+                self._get_tone(self._uid(update))
+            )
             
             # Generate AI response
-            ai_response = await ai_service.generate_response(
+            ai_response = await self._cached_generate(
                 message=text,
                 user_id=user_id,
                 context=context_memories,
@@ -1044,7 +1577,7 @@ Make it informative and well-organized."""
                 response_text = ai_response["response"]
                 
                 # Store bot response in memory
-                await memory_service.store_memory(
+                self._store_memory(
                     user_id=user_id,
                     text=response_text,
                     interaction_type="bot_response",
@@ -1052,42 +1585,68 @@ Make it informative and well-organized."""
                 )
                 
                 # Send response
-                await update.message.reply_text(response_text, parse_mode=ParseMode.MARKDOWN)
+                await self._reply(update, response_text, parse_mode=_MD)
                 
                 logger.info(f"✅ Processed message for user {user_id} | Source: {ai_response['source']}")
                 
             else:
-                await update.message.reply_text("Sorry, I encountered an error. Please try again.")
+                await self._reply(update, "Sorry, I encountered an error. Please try again.")
                 logger.error(f"AI response failed for user {user_id}: {ai_response.get('error')}")
                 
         except Exception as e:
             logger.error(f"Message processing failed: {e}")
-            await update.message.reply_text("Sorry, I encountered an error. Please try again.")
+            await self._reply(update, "Sorry, I encountered an error. Please try again.")
     
-    def _check_rate_limit(self, user_id: str, action: str) -> bool:
-        """Simple rate limiting (replace with Redis-based in production)"""
-        current_time = datetime.utcnow().timestamp()
-        
-        # Rate limits per action type
-        limits = {
-            "message": 30,  # 30 seconds
-            "ask": 15,      # 15 seconds
-            "voice": 60     # 60 seconds
-        }
+    async def _check_rate_limit(self, uid: int, action: str) -> bool:
+        """Per-user token bucket for each action type, shared across workers via Redis"""
+        # Bursts of 3, then one per 30s/15s/60s
+        capacity, rate = _RATE_LIMITS.get(action, (3, 1 / 30))
+        
+        if self._rate_script is not None:
+            try:
+                allowed = await self._rate_script(
+                    keys=[f"rate_limit:{uid}:{action}"],
+                    args=[capacity, rate / 1000, int(time.time() * 1000)]
+                )
+                return bool(allowed)
+            except Exception as e:
+                logger.debug(f"Redis rate limit unavailable, using local bucket: {e}")
         
-        limit_duration = limits.get(action, 30)
+        now = time.monotonic()
         
-        if user_id not in self.rate_limits:
-            self.rate_limits[user_id] = {}
+        buckets = self.rate_limits.get(uid)
+        if buckets is None:
+            buckets = self.rate_limits[uid] = {}
         
-        last_action_time = self.rate_limits[user_id].get(action, 0)
+        # (tokens, last_refill); a new bucket starts full
+        tokens, last_refill = buckets.get(action, (capacity, now))
+        tokens = min(capacity, tokens + (now - last_refill) * rate)
         
-        if current_time - last_action_time < limit_duration:
+        if tokens < 1:
+            buckets[action] = (tokens, now)
             return False
         
-        self.rate_limits[user_id][action] = current_time
+        buckets[action] = (tokens - 1, now)
         return True
     
+    async def _get_tone(self, uid: int) -> str:
+        """User's tone, read from Redis so every worker sees the same choice"""
+        if self._redis:
+            try:
+                return await self._redis.get(f"user_tone:{uid}") or "friendly"
+            except Exception as e:
+                logger.debug(f"Redis tone lookup failed, using local state: {e}")
+        return self.user_tones.get(uid, "friendly")
+    
+    async def _set_tone(self, uid: int, tone: str):
+        """Remember the user's tone locally and in Redis"""
+        self.user_tones[uid] = tone
+        if self._redis:
+            try:
+                await self._redis.set(f"user_tone:{uid}", tone, ex=_TONE_TTL)
+            except Exception as e:
+                logger.warning(f"Failed to store tone in Redis: {e}")
+    
     async def process_webhook_update(self, update_dict: dict):
         """Process webhook update from Telegram"""
         try:
@@ -1097,8 +1656,8 @@ Make it informative and well-organized."""
             update = Update.de_json(update_dict, self.app.bot)
             
             if update:
-                # Process the update through the application
-                await self.app.process_update(update)
+                # Hand off to the application; don't hold Telegram's request open
+                self._dispatch_update(update)
             else:
                 logger.warning("Failed to parse webhook update")
                 
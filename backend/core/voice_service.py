@@ -7,8 +7,9 @@ import os
 import logging
 import hashlib
 import tempfile
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, Union, BinaryIO
 from datetime import datetime
+import numpy as np
 import redis.asyncio as aioredis
 from .model_manager import model_manager
 from .config_manager import config
@@ -100,11 +101,15 @@ class VoiceService:
     
     async def transcribe_audio(
         self, 
-        file_path: str, 
+        file_path: Union[str, BinaryIO], 
         user_id: str,
         apply_vad: bool = True
     ) -> Dict[str, Any]:
-        """Transcribe audio with cached Whisper model"""
+        """Transcribe audio with cached Whisper model
+        
+        Accepts a path or an in-memory file; the latter is decoded through
+        ffmpeg pipes and never touches disk.
+        """
         
         if not self._initialized:
             await self.initialize()
@@ -117,6 +122,11 @@ class VoiceService:
                         config.voice.whisper_model_size
                     )
                     
+                    if not isinstance(file_path, str):
+                        return await self._transcribe_in_memory(
+                            whisper_model, file_path.read(), user_id, apply_vad
+                        )
+                    
                     # Process audio if needed
                     processed_path = file_path
                     if AUDIO_PROCESSING_AVAILABLE and apply_vad:
@@ -135,8 +145,11 @@ class VoiceService:
                     loop = asyncio.get_event_loop()
                     result = await loop.run_in_executor(
                         None, 
-                        lambda: whisper_model.transcribe(processed_path)
+                        lambda: model_manager.run_inference(
+                            "whisper", whisper_model.transcribe, processed_path
+                        )
                     )
+                    model_manager.after_inference()
                     
                     transcription = result.get("text", "").strip()
                     
@@ -169,13 +182,53 @@ class VoiceService:
                         "processed_at": datetime.utcnow().isoformat()
                     }
     
+    async def _transcribe_in_memory(
+        self, whisper_model, audio_data: bytes, user_id: str, apply_vad: bool
+    ) -> Dict[str, Any]:
+        """Decode, trim and transcribe audio bytes without temp files"""
+        audio = await self._decode_audio(audio_data)
+        if audio is None:
+            raise RuntimeError("Audio decoding failed")
+        
+        duration = len(audio) / self.sample_rate
+        if apply_vad:
+            speech = self._trim_silence(audio, self.sample_rate)
+            if speech is not None:
+                audio = speech
+        
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(
+            None,
+            lambda: model_manager.run_inference("whisper", whisper_model.transcribe, audio)
+        )
+        model_manager.after_inference()
+        
+        transcription = result.get("text", "").strip()
+        await self._update_voice_stats(user_id, "transcription", duration)
+        
+        logger.info(f"✅ Audio transcribed for user {user_id[:8]}... | {len(transcription)} chars")
+        
+        return {
+            "success": True,
+            "transcription": transcription,
+            "duration": duration,
+            "confidence": result.get("language_probability", 0.0),
+            "detected_language": result.get("language", "en"),
+            "processed_at": datetime.utcnow().isoformat()
+        }
+    
     async def generate_speech(
         self,
         text: str,
         user_id: str,
-        tone: str = "friendly"
+        tone: str = "friendly",
+        as_bytes: bool = False
     ) -> Dict[str, Any]:
-        """Generate speech with caching"""
+        """Generate speech with caching
+        
+        With ``as_bytes`` the result carries ``audio_bytes`` instead of an
+        ``audio_path``, so cache hits skip the temp-file round trip.
+        """
         
         if not self._initialized:
             await self.initialize()
@@ -188,12 +241,15 @@ class VoiceService:
             cached_audio = await redis.get(f"tts_cache:{cache_key}")
             if cached_audio:
                 # Return cached audio
-                temp_path = await self._write_cached_audio(cached_audio)
                 logger.debug(f"✅ TTS cache hit for user {user_id[:8]}...")
+                if as_bytes:
+                    audio = {"audio_bytes": cached_audio}
+                else:
+                    audio = {"audio_path": await self._write_cached_audio(cached_audio)}
                 
                 return {
                     "success": True,
-                    "audio_path": temp_path,
+                    **audio,
                     "source": "cache",
                     "tone": tone,
                     "text_length": len(text),
@@ -210,7 +266,12 @@ class VoiceService:
                 }
             
             # Cache the generated audio
-            await self._cache_generated_audio(cache_key, audio_path)
+            audio_data = await self._cache_generated_audio(cache_key, audio_path)
+            if as_bytes and audio_data is not None:
+                audio = {"audio_bytes": audio_data}
+                await self._cleanup_temp_files([audio_path])
+            else:
+                audio = {"audio_path": audio_path}
             
             # Update stats
             await self._update_voice_stats(user_id, "generation", 0.0)
@@ -219,7 +280,7 @@ class VoiceService:
             
             return {
                 "success": True,
-                "audio_path": audio_path,
+                **audio,
                 "source": "generated",
                 "tone": tone,
                 "text_length": len(text),
@@ -270,12 +331,61 @@ class VoiceService:
             logger.error(f"Audio conversion error: {e}")
             return None
     
+    async def _decode_audio(self, audio_data: bytes) -> Optional[np.ndarray]:
+        """Decode any ffmpeg-readable audio to mono float32 PCM via stdin/stdout pipes"""
+        try:
+            cmd = [
+                "ffmpeg", "-i", "pipe:0",
+                "-ar", str(self.sample_rate),
+                "-ac", "1",  # Mono
+                "-f", "f32le",
+                "pipe:1"
+            ]
+            
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            
+            stdout, stderr = await process.communicate(audio_data)
+            
+            if process.returncode == 0:
+                return np.frombuffer(stdout, dtype=np.float32)
+            
+            logger.warning(f"FFmpeg decoding failed: {stderr.decode()}")
+            return None
+            
+        except Exception as e:
+            logger.error(f"Audio decoding error: {e}")
+            return None
+    
     async def _apply_vad(self, audio_path: str) -> Optional[str]:
         """Apply Voice Activity Detection to remove silence"""
         try:
             # Load audio
             audio, sr = librosa.load(audio_path, sr=self.sample_rate)
             
+            speech_audio = self._trim_silence(audio, sr)
+            if speech_audio is None:
+                return None
+            
+            # Save cleaned audio
+            temp_fd, temp_path = tempfile.mkstemp(suffix=".wav", prefix="eva_vad_")
+            os.close(temp_fd)
+            
+            sf.write(temp_path, speech_audio, self.sample_rate)
+            
+            return temp_path
+            
+        except Exception as e:
+            logger.error(f"VAD processing error: {e}")
+            return None
+    
+    def _trim_silence(self, audio: np.ndarray, sr: int) -> Optional[np.ndarray]:
+        """Keep only the speech segments of a waveform (energy-based VAD)"""
+        try:
             # Simple energy-based VAD
             frame_length = int(0.025 * sr)  # 25ms frames
             hop_length = int(0.010 * sr)   # 10ms hop
@@ -291,7 +401,6 @@ class VoiceService:
                 return None
             
             # Normalize energy
-            import numpy as np
             energy = np.array(energy)
             energy = (energy - np.min(energy)) / (np.max(energy) - np.min(energy) + 1e-8)
             
@@ -314,14 +423,9 @@ class VoiceService:
             if not speech_audio:
                 return None
             
-            # Save cleaned audio
-            temp_fd, temp_path = tempfile.mkstemp(suffix=".wav", prefix="eva_vad_")
-            os.close(temp_fd)
-            
-            sf.write(temp_path, np.array(speech_audio), self.sample_rate)
             logger.debug(f"✅ VAD applied: {len(speech_segments)} segments found")
             
-            return temp_path
+            return np.array(speech_audio, dtype=np.float32)
             
         except Exception as e:
             logger.error(f"VAD processing error: {e}")
@@ -510,8 +614,9 @@ $speak.Dispose()
         
         return temp_path
     
-    async def _cache_generated_audio(self, cache_key: str, audio_path: str):
-        """Cache generated audio for future use"""
+    async def _cache_generated_audio(self, cache_key: str, audio_path: str) -> Optional[bytes]:
+        """Cache generated audio for future use, returning the bytes read"""
+        audio_data = None
         try:
             redis = aioredis.Redis(connection_pool=self._redis_pool)
             
@@ -533,6 +638,8 @@ $speak.Dispose()
             
         except Exception as e:
             logger.debug(f"Audio caching failed: {e}")
+        
+        return audio_data
     
     async def _get_audio_duration(self, file_path: str) -> float:
         """Get audio file duration in seconds"""
@@ -18,6 +18,7 @@ from core import (
     voice_service,
     telegram_gateway
 )
+from core.lora_service import lora_service
 
 # Setup logging
 logging.basicConfig(
@@ -26,6 +27,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Optional libuv event loop (ships with uvicorn[standard]); stock asyncio otherwise
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 class EvaCleanBot:
     """Eva bot with clean architecture"""
     
@@ -46,7 +54,7 @@ class EvaCleanBot:
         try:
             # Initialize all services in order
             logger.info("📚 Warming up models...")
-            await model_manager.warm_up_models()
+            await model_manager.warm_up()
             
             logger.info("🤖 Initializing AI service...")
             await ai_service.initialize()
@@ -182,6 +190,7 @@ class EvaCleanBot:
             await ai_service.cleanup()
             await memory_service.cleanup()
             await voice_service.cleanup()
+            await lora_service.cleanup()
             logger.info("✅ Cleanup completed")
         except Exception as e:
             logger.error(f"❌ Cleanup error: {e}")
@@ -224,12 +233,17 @@ async def main():
             print("Usage: python eva_clean.py [health|webhook|polling]")
             print("  health  - Run health check")
             print("  webhook - Start in webhook mode")
-            print("  polling - Start in polling mode (default)")
+            print("  polling - Start in polling mode (development)")
+    elif config.telegram.is_webhook_mode:
+        # Production default: TELEGRAM_WEBHOOK_URL (or TELEGRAM_MODE=webhook) is set
+        await eva_bot.start_webhook()
     else:
-        # Default to polling mode
+        # Development fallback
         await eva_bot.start_polling()
 
 if __name__ == "__main__":
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
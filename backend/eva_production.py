@@ -18,6 +18,7 @@ from core import (
     voice_service,
     telegram_gateway
 )
+from core.lora_service import lora_service
 
 # Setup enhanced logging
 logging.basicConfig(
@@ -30,6 +31,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Optional libuv event loop (ships with uvicorn[standard]); stock asyncio otherwise
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 class EvaProductionBot:
     """Enhanced Eva bot with production features"""
     
@@ -58,7 +66,7 @@ class EvaProductionBot:
             start = time.time()
             
             logger.info("📚 Warming up models...")
-            await model_manager.warm_up_models()
+            await model_manager.warm_up()
             model_time = time.time() - start
             
             logger.info("🤖 Initializing AI service...")
@@ -168,6 +176,7 @@ class EvaProductionBot:
             await ai_service.cleanup()
             await memory_service.cleanup()
             await voice_service.cleanup()
+            await lora_service.cleanup()
             
             print(f"\n📊 Final Stats:")
             print(f"   Uptime: {uptime}")
@@ -204,6 +213,8 @@ async def main():
     await eva_bot.start_with_monitoring()
 
 if __name__ == "__main__":
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -60,7 +60,7 @@ async def initialize_services():
         
         # Initialize model manager first
         logger.info("🔥 Warming up models...")
-        await model_manager.warm_up_models()
+        await model_manager.warm_up()
         
         # Initialize services
         logger.info("🤖 Initializing AI service...")
@@ -101,10 +101,11 @@ async def shutdown_event():
     logger.info("🛑 Shutting down Eva services...")
     
     try:
+        await telegram_gateway.stop()
         await ai_service.cleanup()
         await memory_service.cleanup()
         await voice_service.cleanup()
-        await telegram_gateway.stop()
+        await lora_service.cleanup()
         logger.info("✅ Eva Lite services shut down successfully")
     except Exception as e:
         logger.error(f"❌ Shutdown error: {e}")
@@ -337,7 +338,7 @@ if __name__ == "__main__":
         workers=1,  # Single worker for GPU memory efficiency
         access_log=True,
         log_level="info",
-        loop="asyncio",
+        loop="auto",  # uvloop when installed
         reload=False,  # Disable reload in production
         timeout_keep_alive=30,
         timeout_graceful_shutdown=30
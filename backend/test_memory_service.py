@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+MemoryService unit tests
+Run from backend/: python -m unittest test_memory_service
+"""
+import asyncio
+import os
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+# Config refuses to load without a bot token; unit tests never reach Telegram
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+
+from core.memory_service import MemoryService
+
+class StoreBatchingTest(unittest.IsolatedAsyncioTestCase):
+    """Micro-batched writes through _flush_loop and their shutdown in cleanup()"""
+
+    async def asyncSetUp(self):
+        self.service = MemoryService()
+        self.service._initialized = True
+        self.service._collection = MagicMock()
+        self.service._embed_texts = AsyncMock(side_effect=lambda texts: [[0.0, 1.0] for _ in texts])
+        self.service._cache_recent_memory = AsyncMock()
+        self.service._flush_task = asyncio.create_task(self.service._flush_loop())
+
+    async def asyncTearDown(self):
+        await self.service.cleanup()
+
+    async def _store(self, n: int):
+        return await asyncio.gather(*(
+            self.service.store_memory(user_id="user", text=f"memory {i}") for i in range(n)
+        ))
+
+    async def test_concurrent_writes_share_one_encode_and_add(self):
+        self.assertEqual(await self._store(3), [True, True, True])
+
+        self.service._embed_texts.assert_awaited_once()
+        self.service._collection.add.assert_called_once()
+        self.assertEqual(
+            self.service._collection.add.call_args.kwargs["documents"],
+            ["memory 0", "memory 1", "memory 2"]
+        )
+
+    async def test_failed_add_fails_the_batch_and_keeps_flushing(self):
+        self.service._collection.add.side_effect = RuntimeError("chroma down")
+        self.assertEqual(await self._store(2), [False, False])
+
+        self.service._collection.add.side_effect = None
+        self.assertEqual(await self._store(1), [True])
+
+    async def test_cleanup_flushes_queued_writes(self):
+        writes = asyncio.gather(*(
+            self.service.store_memory(user_id="user", text=f"memory {i}") for i in range(3)
+        ))
+        await asyncio.sleep(0)  # let every write reach the queue
+
+        await self.service.cleanup()
+
+        self.assertEqual(await writes, [True, True, True])
+        self.service._collection.add.assert_called_once()
+        self.assertIsNone(self.service._flush_task)
+
+    async def test_writes_after_cleanup_are_refused(self):
+        await self.service.cleanup()
+
+        self.assertEqual(await self._store(1), [False])
+        self.service._collection.add.assert_not_called()
+
+    async def test_cancelled_flush_fails_in_flight_writes(self):
+        started = asyncio.Event()
+
+        async def hang(texts):
+            started.set()
+            await asyncio.Event().wait()
+
+        self.service._embed_texts = AsyncMock(side_effect=hang)
+        write = asyncio.ensure_future(self.service.store_memory(user_id="user", text="memory"))
+        await started.wait()
+
+        self.service._flush_task.cancel()
+
+        self.assertFalse(await asyncio.wait_for(write, timeout=1.0))
+
+class SimilarityTest(unittest.TestCase):
+    """Chroma distance -> [0, 1] similarity for each collection space"""
+
+    def setUp(self):
+        self.service = MemoryService()
+
+    def _similarities(self, space: str, distances):
+        self.service._distance_space = space
+        return [self.service._similarity(d) for d in distances]
+
+    def test_cosine(self):
+        self.assertEqual(self._similarities("cosine", [0.0, 0.25, 1.0, 2.0]), [1.0, 0.75, 0.0, 0.0])
+
+    def test_inner_product(self):
+        self.assertEqual(self._similarities("ip", [0.0, 0.5, 1.5, -0.25]), [1.0, 0.5, 0.0, 1.0])
+
+    def test_squared_l2(self):
+        # Unit vectors: identical 0, orthogonal 2, opposed 4
+        self.assertEqual(self._similarities("l2", [0.0, 1.0, 2.0, 4.0]), [1.0, 0.5, 0.0, 0.0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+TelegramGateway unit tests
+Run from backend/: python -m unittest test_telegram_gateway
+"""
+import asyncio
+import importlib
+import importlib.util
+import os
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+
+# Config refuses to load without a bot token; unit tests never reach Telegram
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+
+from core.telegram_gateway import TelegramGateway, _MD, _RATE_LIMIT_LUA, _RESPONSE_CACHE_PER_USER
+
+# core re-exports the gateway instance under the module's name
+gateway_module = importlib.import_module("core.telegram_gateway")
+
+# The Lua bucket runs against fakeredis when it (and its Lua runtime) is installed
+FAKEREDIS_AVAILABLE = all(importlib.util.find_spec(m) for m in ("fakeredis", "lupa"))
+
+USER_ID = "42"
+QUESTION = "What is a good book about history?"
+
+def _update(uid: int = 42):
+    """Minimal Update stand-in for handlers that only read the user"""
+    update = MagicMock()
+    update.effective_user.id = uid
+    return update
+
+class ResponseCacheTest(unittest.IsolatedAsyncioTestCase):
+    """Per-user semantic response cache in _cached_generate"""
+
+    def setUp(self):
+        self.gateway = TelegramGateway()
+        self.vectors = {}
+
+        async def embed_text(text):
+            return self.vectors[text]
+
+        async def generate_response(message, **kwargs):
+            return {"success": True, "response": f"answer to {message}", "source": "local_gpu"}
+
+        self.generate = AsyncMock(side_effect=generate_response)
+        patches = [
+            patch.object(gateway_module.memory_service, "embed_text", AsyncMock(side_effect=embed_text)),
+            patch.object(gateway_module.ai_service, "generate_response", self.generate)
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    async def _ask(self, message: str, tone: str = "friendly"):
+        return await self.gateway._cached_generate(message=message, user_id=USER_ID, context=[], tone=tone)
+
+    async def test_repeat_question_hits_cache(self):
+        self.vectors[QUESTION] = [1.0, 0.0]
+
+        first = await self._ask(QUESTION)
+        second = await self._ask(QUESTION)
+
+        self.assertEqual(self.generate.await_count, 1)
+        self.assertEqual(second["source"], "cache")
+        self.assertEqual(second["response"], first["response"])
+
+    async def test_other_tone_misses(self):
+        self.vectors[QUESTION] = [1.0, 0.0]
+
+        await self._ask(QUESTION, tone="friendly")
+        response = await self._ask(QUESTION, tone="formal")
+
+        self.assertEqual(self.generate.await_count, 2)
+        self.assertEqual(response["source"], "local_gpu")
+
+    async def test_similarity_threshold(self):
+        near = "Which good books cover history?"
+        far = "Which good books cover cooking?"
+        self.vectors[QUESTION] = [1.0, 0.0]
+        self.vectors[near] = [0.95, float(np.sqrt(1 - 0.95 ** 2))]  # cosine 0.95
+        self.vectors[far] = [0.9, float(np.sqrt(1 - 0.9 ** 2))]  # cosine 0.90
+
+        await self._ask(QUESTION)
+        self.assertEqual((await self._ask(far))["source"], "local_gpu")
+        self.assertEqual((await self._ask(near))["source"], "cache")
+        self.assertEqual(self.generate.await_count, 2)
+
+    async def test_short_and_volatile_messages_bypass_cache(self):
+        for message in ("why?", "What is the latest news on history?"):
+            await self._ask(message)
+            await self._ask(message)
+
+        self.assertEqual(self.generate.await_count, 4)
+        self.assertNotIn(USER_ID, self.gateway._response_cache)
+
+    async def test_entries_capped_per_user(self):
+        dim = _RESPONSE_CACHE_PER_USER + 8
+        questions = [f"Tell me about topic number {i}" for i in range(dim)]
+        for i, question in enumerate(questions):
+            self.vectors[question] = np.eye(dim)[i].tolist()
+            await self._ask(question)
+
+        entries = self.gateway._response_cache[USER_ID]
+        self.assertEqual(len(entries), _RESPONSE_CACHE_PER_USER)
+        self.assertEqual(entries[0][2], f"answer to {questions[8]}")  # oldest evicted first
+
+        self.assertEqual((await self._ask(questions[-1]))["source"], "cache")
+        self.assertEqual((await self._ask(questions[0]))["source"], "local_gpu")
+
+    async def test_forget_clears_cached_answers(self):
+        self.vectors[QUESTION] = [1.0, 0.0]
+        await self._ask(QUESTION)
+
+        with patch.object(gateway_module.memory_service, "delete_user_data", AsyncMock(return_value=1)), \
+                patch.object(gateway_module.voice_service, "clear_voice_cache", AsyncMock()), \
+                patch.object(self.gateway, "_reply", AsyncMock()):
+            await self.gateway._handle_forget(_update(), None)
+
+        self.assertNotIn(USER_ID, self.gateway._response_cache)
+        self.assertEqual((await self._ask(QUESTION))["source"], "local_gpu")
+
+class OutboundQueueTest(unittest.IsolatedAsyncioTestCase):
+    """Per-chat outbound queue: ordering and coalescing in _drain_outbound"""
+
+    def setUp(self):
+        self.gateway = TelegramGateway()
+        self.gateway._pace = AsyncMock()
+        self.sent = []
+
+        async def send_message(**kwargs):
+            self.sent.append(kwargs["text"])
+
+        self.gateway.app = MagicMock()
+        self.gateway.app.bot.send_message = AsyncMock(side_effect=send_message)
+
+    async def _drain(self, chat_id: int = 1):
+        task = self.gateway._outbound_tasks.get(chat_id)
+        if task is not None:
+            await asyncio.wait_for(task, timeout=0.1)
+
+    async def test_lone_reply_goes_out_without_delay(self):
+        await self.gateway._send(1, "hello")
+        await self._drain()
+
+        self.assertEqual(self.sent, ["hello"])
+        self.assertNotIn(1, self.gateway._outbound)
+
+    async def test_waiting_plain_text_is_merged(self):
+        await self.gateway._send(1, "first")
+        await self.gateway._send(1, "second")
+        await self._drain()
+
+        self.assertEqual(self.sent, ["first\n\nsecond"])
+
+    async def test_markdown_is_never_merged(self):
+        await self.gateway._send(1, "*first*", parse_mode=_MD)
+        await self.gateway._send(1, "second")
+        await self.gateway._send(1, "*third*", parse_mode=_MD)
+        await self._drain()
+
+        self.assertEqual(self.sent, ["*first*", "second", "*third*"])
+
+    async def test_unmergeable_notice_stays_separate(self):
+        await self.gateway._send(1, "🔍 Searching...", merge=False)
+        await self.gateway._send(1, "results")
+        await self.gateway._send(1, "more", merge=False)
+        await self._drain()
+
+        self.assertEqual(self.sent, ["🔍 Searching...", "results", "more"])
+
+    async def test_different_reply_targets_are_not_merged(self):
+        await self.gateway._send(1, "first", reply_to=10)
+        await self.gateway._send(1, "second", reply_to=11)
+        await self._drain()
+
+        self.assertEqual(self.sent, ["first", "second"])
+
+    async def test_calls_run_in_queue_order(self):
+        async def send_voice():
+            self.sent.append("voice")
+            return "voice message"
+
+        await self.gateway._send(1, "🤖 answer")
+        result = await self.gateway._send_call(1, send_voice)
+        await self._drain()
+
+        self.assertEqual(self.sent, ["🤖 answer", "voice"])
+        self.assertEqual(result, "voice message")
+
+    async def test_call_errors_reach_the_caller(self):
+        async def failing_edit():
+            raise ValueError("message is not modified")
+
+        with self.assertRaises(ValueError):
+            await self.gateway._send_call(1, failing_edit)
+        await self.gateway._send(1, "after")
+        await self._drain()
+
+        self.assertEqual(self.sent, ["after"])
+
+class RateLimitTest(unittest.IsolatedAsyncioTestCase):
+    """Per-user token buckets in _check_rate_limit: Redis script and local fallback"""
+
+    def setUp(self):
+        self.gateway = TelegramGateway()
+        self.clock = MagicMock()
+        self.clock.monotonic.return_value = 1000.0
+        self.clock.time.return_value = 1_700_000_000.0
+        clock_patch = patch.object(gateway_module, "time", self.clock)
+        clock_patch.start()
+        self.addCleanup(clock_patch.stop)
+
+    async def _attempts(self, n: int, uid: int = 7, action: str = "message"):
+        return [await self.gateway._check_rate_limit(uid, action) for _ in range(n)]
+
+    async def test_local_bucket_bursts_then_refills(self):
+        self.assertEqual(await self._attempts(4), [True, True, True, False])
+
+        self.clock.monotonic.return_value += 30  # one "message" token per 30s
+        self.assertEqual(await self._attempts(2), [True, False])
+
+    async def test_local_buckets_are_per_action_and_user(self):
+        await self._attempts(3)
+
+        self.assertTrue(await self.gateway._check_rate_limit(7, "ask"))
+        self.assertTrue(await self.gateway._check_rate_limit(8, "message"))
+        self.assertFalse(await self.gateway._check_rate_limit(7, "message"))
+
+    async def test_redis_script_decides_when_available(self):
+        self.gateway._rate_script = AsyncMock(return_value=0)
+
+        self.assertFalse(await self.gateway._check_rate_limit(7, "voice"))
+        self.gateway._rate_script.assert_awaited_once_with(
+            keys=["rate_limit:7:voice"],
+            args=[3, 1 / 60 / 1000, 1_700_000_000_000]
+        )
+        self.assertNotIn(7, self.gateway.rate_limits)
+
+    async def test_redis_failure_falls_back_to_local_bucket(self):
+        self.gateway._rate_script = AsyncMock(side_effect=ConnectionError("redis down"))
+
+        self.assertEqual(await self._attempts(4), [True, True, True, False])
+
+    @unittest.skipUnless(FAKEREDIS_AVAILABLE, "fakeredis with Lua support not installed")
+    async def test_lua_bucket_bursts_refills_and_expires(self):
+        import fakeredis.aioredis
+
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        self.gateway._rate_script = redis.register_script(_RATE_LIMIT_LUA)
+
+        self.assertEqual(await self._attempts(4), [True, True, True, False])
+        self.assertGreater(await redis.pttl("rate_limit:7:message"), 0)
+
+        self.clock.time.return_value += 30
+        self.assertEqual(await self._attempts(2), [True, False])
+        self.assertNotIn(7, self.gateway.rate_limits)  # never touched the local fallback
+
+if __name__ == "__main__":
+    unittest.main()